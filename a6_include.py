@@ -5,6 +5,16 @@
 #              are available and how they're implemented.
 #              Don't modify the contents of this file.
 
+import bisect
+import hashlib
+import zlib
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    # batch hash functions fall back to the scalar ones
+    np = None
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
@@ -19,6 +29,8 @@ class DynamicArray:
     append, pop, swap, get_at_index, set_at_index, length
     """
 
+    __slots__ = ('_data',)
+
     def __init__(self, arr=None) -> None:
         """Initialize new dynamic array using a list."""
         self._data = arr.copy() if arr else []
@@ -41,6 +53,10 @@ class DynamicArray:
         """Override string method to provide more readable output."""
         return str(self._data)
 
+    def __sizeof__(self) -> int:
+        """Return the size in bytes of the array and its underlying list."""
+        return object.__sizeof__(self) + self._data.__sizeof__()
+
     def append(self, value: object) -> None:
         """Add new element at the end of the array."""
         self._data.append(value)
@@ -77,6 +93,10 @@ class DynamicArray:
         """Return length of array."""
         return len(self._data)
 
+    def slice(self, start: int, end: int) -> list:
+        """Return the elements from start up to, not including, end as a list."""
+        return self._data[start:end]
+
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
@@ -96,6 +116,272 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# ------------- Seeded hash functions (usable by both maps) ------------- #
+
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_MASK_64 = 0xffffffffffffffff
+
+
+def make_fnv1a_hash(seed: int = 0):
+    """
+    Return a 64-bit FNV-1a hash function over the UTF-8 bytes of a key.
+    The seed is mixed into the offset basis.
+    """
+    basis = (_FNV_OFFSET ^ seed) & _MASK_64
+
+    def fnv1a_hash(key: str) -> int:
+        hash = basis
+        for byte in key.encode('utf-8', 'surrogatepass'):
+            hash = ((hash ^ byte) * _FNV_PRIME) & _MASK_64
+        return hash
+
+    return fnv1a_hash
+
+
+def make_crc32_hash(seed: int = 0):
+    """
+    Return a CRC-32 hash function over the UTF-8 bytes of a key.
+    The seed is used as the starting CRC value.
+    """
+    start = seed & 0xffffffff
+
+    def crc32_hash(key: str) -> int:
+        return zlib.crc32(key.encode('utf-8', 'surrogatepass'), start)
+
+    return crc32_hash
+
+
+def make_keyed_hash(seed: int = 0):
+    """
+    Return a keyed 64-bit hash function built on BLAKE2b. Like SipHash, keys
+    cannot be chosen to collide without knowing the seed.
+    """
+    secret = (seed & _MASK_64).to_bytes(8, 'little')
+
+    def keyed_hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode('utf-8', 'surrogatepass'),
+                                 digest_size=8, key=secret).digest()
+        return int.from_bytes(digest, 'little')
+
+    return keyed_hash
+
+
+fnv1a_hash = make_fnv1a_hash()
+crc32_hash = make_crc32_hash()
+keyed_hash = make_keyed_hash()
+
+
+def mix_hash(hash: int) -> int:
+    """
+    Finalize a hash with the 64-bit MurmurHash3 mixer, so that every input bit
+    affects the low bits used by power-of-two tables
+    """
+    hash &= _MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xff51afd7ed558ccd) & _MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xc4ceb9fe1a85ec53) & _MASK_64
+    hash ^= hash >> 33
+    return hash
+
+
+# one mixed wrapper per hash function, so its batch version can be registered
+_MIXED_HASH_FUNCTIONS = {}
+
+
+def make_mixed_hash(function):
+    """
+    Return a hash function that applies mix_hash to the result of the given one.
+    """
+    mixed = _MIXED_HASH_FUNCTIONS.get(function)
+    if mixed is None:
+        def mixed(key: str) -> int:
+            return mix_hash(function(key))
+
+        def mixed_batch(keys: list) -> list:
+            return [mix_hash(hash) for hash in batch_hash_function(function)(keys)]
+
+        _MIXED_HASH_FUNCTIONS[function] = mixed
+        BATCH_HASH_FUNCTIONS[mixed] = mixed_batch
+    return mixed
+
+
+def _is_prime(capacity: int) -> bool:
+    """Return True if the given integer is a prime number."""
+    if capacity == 2 or capacity == 3:
+        return True
+
+    if capacity == 1 or capacity % 2 == 0:
+        return False
+
+    factor = 3
+    while factor ** 2 <= capacity:
+        if capacity % factor == 0:
+            return False
+        factor += 2
+
+    return True
+
+
+# Each prime is next_prime(2 * the one before), so every capacity from twice a
+# prime up to the next prime on the ladder rounds to that next prime.
+_PRIME_LADDER = (
+    3, 7, 17, 37, 79, 163, 331, 673, 1361, 2729, 5471, 10949, 21911, 43853,
+    87719, 175447, 350899, 701819, 1403641, 2807303, 5614657, 11229331,
+    22458671, 44917381, 89834777, 179669557, 359339171, 718678369,
+    1437356741, 2874713497,
+)
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Return the smallest odd prime at or above capacity, like HashMap._next_prime.
+    Capacities that round to a prime on the ladder are looked up with bisect;
+    the rest, including any above the ladder, are searched for.
+    """
+    index = bisect.bisect_left(_PRIME_LADDER, capacity)
+    if index < len(_PRIME_LADDER):
+        low = 2 * _PRIME_LADDER[index - 1] if index else 0
+        if capacity >= low:
+            return _PRIME_LADDER[index]
+    return _search_prime(capacity)
+
+
+@lru_cache(maxsize=128)
+def _search_prime(capacity: int) -> int:
+    """
+    Return the smallest odd prime at or above capacity. The last results are
+    cached, so maps that grow through the same sizes rarely search twice.
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not _is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
+def next_power_of_two(capacity: int) -> int:
+    """Return the smallest power of two at or above capacity."""
+    return 1 << max(capacity - 1, 0).bit_length()
+
+
+class ConcurrentModificationException(RuntimeError):
+    """
+    Raised by an iterator whose hash map added or removed a key, or was
+    resized or cleared, since the iteration started.
+    """
+    pass
+
+
+class MapView:
+    """
+    Lazy view of the keys, values or (key, value) pairs of a hash map. Nothing
+    is copied: every loop over the view gets its own iterator, which walks the
+    map's buckets as it goes. The view always reflects the current contents.
+    """
+
+    __slots__ = ('_map', '_kind')
+
+    def __init__(self, hash_map, kind: str) -> None:
+        """Initialize a view of 'keys', 'values' or 'items' of a hash map."""
+        self._map = hash_map
+        self._kind = kind
+
+    def __len__(self) -> int:
+        """Return the number of keys in the map."""
+        return self._map.get_size()
+
+    def __iter__(self):
+        """Return a new iterator over the map."""
+        if self._kind == 'keys':
+            return (entry.key for entry in self._map)
+        if self._kind == 'values':
+            return (entry.value for entry in self._map)
+        return ((entry.key, entry.value) for entry in self._map)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return f"{self._kind.upper()}: {list(self)}"
+
+    def chunks(self, size: int):
+        """Yield the view's elements in dynamic arrays of at most size
+        elements, for exporting a large map in batches.
+        """
+        chunk = []
+        for element in self:
+            chunk.append(element)
+            if len(chunk) == size:
+                yield DynamicArray(chunk)
+                chunk = []
+        if chunk:
+            yield DynamicArray(chunk)
+
+
+def _code_points(keys: list):
+    """
+    Encode keys into one buffer of code points. Returns the buffer along with
+    the start and end offset of every key in it.
+    """
+    lengths = np.fromiter((len(key) for key in keys), dtype=np.int64, count=len(keys))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    buffer = ''.join(keys).encode('utf-32-le', 'surrogatepass')
+    codes = np.frombuffer(buffer, dtype=np.uint32).astype(np.uint64)
+    return codes, starts, ends, lengths
+
+
+def _segment_sums(values, starts, ends) -> list:
+    """
+    Sum values between each start/end pair using one cumulative sum.
+    The uint64 running total may wrap around, but the difference of two
+    totals is still exact as long as every single key's sum fits in 64 bits.
+    """
+    totals = np.zeros(values.shape[0] + 1, dtype=np.uint64)
+    np.cumsum(values, out=totals[1:])
+    return (totals[ends] - totals[starts]).tolist()
+
+
+def hash_function_1_batch(keys: list) -> list:
+    """Return hash_function_1 of every key, computed in one vectorized pass"""
+    keys = list(keys)
+    if np is None or not keys:
+        return [hash_function_1(key) for key in keys]
+    codes, starts, ends, _ = _code_points(keys)
+    return _segment_sums(codes, starts, ends)
+
+
+def hash_function_2_batch(keys: list) -> list:
+    """Return hash_function_2 of every key, computed in one vectorized pass"""
+    keys = list(keys)
+    if np is None or not keys:
+        return [hash_function_2(key) for key in keys]
+    codes, starts, ends, lengths = _code_points(keys)
+    # 1-based position of every code point within its own key
+    positions = np.arange(1, codes.shape[0] + 1, dtype=np.uint64)
+    positions -= np.repeat(starts, lengths).astype(np.uint64)
+    return _segment_sums(codes * positions, starts, ends)
+
+
+BATCH_HASH_FUNCTIONS = {
+    hash_function_1: hash_function_1_batch,
+    hash_function_2: hash_function_2_batch,
+}
+
+
+def batch_hash_function(function):
+    """
+    Return a function that hashes a sequence of keys with the given hash
+    function, using its vectorized version when one is available.
+    """
+    batch = BATCH_HASH_FUNCTIONS.get(function)
+    if batch is not None:
+        return batch
+    return lambda keys: [function(key) for key in keys]
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,11 +389,18 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value. The full hash of the key
+        can be stored alongside so the table never has to recompute it.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -144,6 +437,8 @@ class LinkedList:
     Supported methods are: insert, remove, contains, length, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +463,21 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Insert new node (with optional cached hash) at front of the list."""
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If the key's hash is given, it is compared before the key itself.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,11 +488,21 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If the key's hash is given, it is compared before the key itself.
+        """
         node = self._head
+        if hash is None:
+            while node:
+                if node.key == key:
+                    return node
+                node = node.next
+            return node
+
         while node:
-            if node.key == key:
+            if node.hash == hash and node.key == key:
                 return node
             node = node.next
         return node
@@ -205,15 +511,26 @@ class LinkedList:
         """Return the length of the list."""
         return self._size
 
+    def clear(self) -> None:
+        """Remove every node from the list."""
+        self._head = None
+        self._size = 0
+
 
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map. The full hash of the key
+        can be stored alongside so the table never has to recompute it.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -0,0 +1,747 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Benchmark harness for the HashMap implementations. Every
+# backend is run with every selected hash function on a set of workloads:
+# insert, read, miss, delete, mixed, churn and find_mode. Each run reports
+# throughput, p50/p99/max latency per operation, peak memory and the number
+# of resizes as JSON, and can be compared with an earlier report to flag
+# throughput regressions. --key-set picks the keys (random by default).
+#
+# These options report something else instead:
+#   --distribution       how evenly each hash function spreads key sets
+#   --threads            throughput of the thread-safe maps per thread count
+#   --find-mode-workers  speedup of find_mode_parallel over find_mode
+#   --heavy-hitters      accuracy and memory of SpaceSaving summaries
+#   --cache              hit rate and throughput of each eviction policy
+#   --wal                write throughput and replay time per sync policy
+#   --bulk               put_many, get_many and remove_many against loops
+#   --batch-hash         batch hash functions against the scalar ones
+#
+# Usage:
+#   python benchmark.py --size 20000 --output results.json
+#   python benchmark.py --baseline results.json --tolerance 0.15
+#   python benchmark.py --backends oa swiss --workloads miss
+#   python benchmark.py --threads 1 2 4 8 --functions fnv1a
+
+import argparse
+import functools
+import importlib.util
+import json
+import os
+import platform
+import random
+import shutil
+import string
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import hash_map_cache
+import hash_map_concurrent
+import hash_map_cuckoo
+import hash_map_oa
+import hash_map_oa_arrays
+import hash_map_rh
+import hash_map_sc
+import hash_map_swiss
+import hash_map_wal
+import heavy_hitters
+from a6_include import (BATCH_HASH_FUNCTIONS, DynamicArray, batch_hash_function,
+                        crc32_hash, fnv1a_hash, hash_function_1, hash_function_2,
+                        keyed_hash)
+
+
+BACKENDS = {
+    'sc': hash_map_sc.HashMap,
+    'sc-incremental': functools.partial(hash_map_sc.HashMap, incremental_resize=8),
+    'sc-pow2': functools.partial(hash_map_sc.HashMap, power_of_two=True),
+    'oa': hash_map_oa.HashMap,
+    'oa-pow2': functools.partial(hash_map_oa.HashMap, power_of_two=True),
+    'oa-linear': functools.partial(hash_map_oa.HashMap, probing='linear'),
+    'oa-triangular': functools.partial(hash_map_oa.HashMap, probing='triangular'),
+    'oa-double': functools.partial(hash_map_oa.HashMap, probing='double'),
+    'oa-arrays': hash_map_oa_arrays.HashMap,
+    'rh': hash_map_rh.HashMap,
+    'swiss': hash_map_swiss.HashMap,
+    'cuckoo': hash_map_cuckoo.HashMap,
+}
+
+
+class GlobalLockMap:
+    """Serializes every call to a hash_map_sc.HashMap with one lock, the
+    way a map shared between threads is protected without lock striping.
+    """
+
+    def __init__(self, capacity: int, function) -> None:
+        self._map = hash_map_sc.HashMap(capacity, function)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> object:
+        with self._lock:
+            return self._map.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        with self._lock:
+            return self._map.contains_key(key)
+
+    def put(self, key: str, value: object) -> None:
+        with self._lock:
+            self._map.put(key, value)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._map.remove(key)
+
+
+# maps that can be shared between threads, for --threads
+CONCURRENT_BACKENDS = {
+    'sc-global-lock': GlobalLockMap,
+    'sc-striped': hash_map_concurrent.HashMap,
+}
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': fnv1a_hash,
+    'crc32': crc32_hash,
+    'keyed': keyed_hash,
+}
+
+
+# ------------------- KEY AND WORKLOAD GENERATION -------------------------- #
+
+def make_keys(count: int, rng: random.Random) -> list:
+    """Returns a list of distinct random string keys of varying length.
+    """
+    alphabet = string.ascii_letters + string.digits
+    keys = set()
+    while len(keys) < count:
+        length = rng.randint(6, 24)
+        keys.add(''.join(rng.choice(alphabet) for _ in range(length)))
+    return list(keys)
+
+
+def insert_workload(size: int, rng: random.Random, make=make_keys) -> (list, list):
+    """Puts every key of an empty map once, then overwrites a tenth of them.
+    """
+    keys = make(size, rng)
+    ops = [('put', key, i) for i, key in enumerate(keys)]
+    ops += [('put', key, -1) for key in rng.sample(keys, size // 10)]
+    return [], ops
+
+
+def read_workload(size: int, rng: random.Random, make=make_keys) -> (list, list):
+    """Gets keys from a preloaded map: 90% hits and 10% misses.
+    """
+    keys = make(size + size // 10, rng)
+    present, absent = keys[:size], keys[size:]
+    preload = [(key, i) for i, key in enumerate(present)]
+    ops = [('get', rng.choice(present), None) for _ in range(size)]
+    ops += [('get', key, None) for key in absent]
+    rng.shuffle(ops)
+    return preload, ops
+
+
+def miss_workload(size: int, rng: random.Random, make=make_keys) -> (list, list):
+    """Checks keys against a preloaded map with contains_key: 90% misses
+    and 10% hits.
+    """
+    keys = make(size * 2, rng)
+    preload = [(key, i) for i, key in enumerate(keys[:size])]
+    ops = [('contains', key, None) for key in keys[size:size + size * 9 // 10]]
+    ops += [('contains', key, None) for key in rng.sample(keys[:size], size // 10)]
+    rng.shuffle(ops)
+    return preload, ops
+
+
+def delete_workload(size: int, rng: random.Random, make=make_keys) -> (list, list):
+    """Removes every key of a preloaded map in random order.
+    """
+    keys = make(size, rng)
+    preload = [(key, i) for i, key in enumerate(keys)]
+    order = keys[:]
+    rng.shuffle(order)
+    ops = [('remove', key, None) for key in order]
+    return preload, ops
+
+
+def mixed_workload(size: int, rng: random.Random, make=make_keys) -> (list, list):
+    """Runs 50% gets, 30% puts and 20% removes against a half-full map.
+    """
+    keys = make(size, rng)
+    preload = [(key, i) for i, key in enumerate(keys[:size // 2])]
+    ops = []
+    for i in range(size):
+        key = rng.choice(keys)
+        roll = rng.random()
+        if roll < 0.5:
+            ops.append(('get', key, None))
+        elif roll < 0.8:
+            ops.append(('put', key, i))
+        else:
+            ops.append(('remove', key, None))
+    return preload, ops
+
+
+def churn_workload(size: int, rng: random.Random, make=make_keys) -> (list, list):
+    """Keeps the map size constant by removing an old key for every new key,
+    which leaves a trail of tombstones in open-addressing maps.
+    """
+    keys = make(size * 2, rng)
+    live = size // 4
+    preload = [(key, i) for i, key in enumerate(keys[:live])]
+    ops = []
+    for i in range(live, len(keys)):
+        ops.append(('remove', keys[i - live], None))
+        ops.append(('put', keys[i], i))
+    return preload, ops
+
+
+def find_mode_workload(size: int, rng: random.Random, make=make_keys) -> (list, list):
+    """Counts a skewed stream the same way hash_map_sc.find_mode does:
+    contains_key, get and put for every element.
+    """
+    keys = make(max(size // 20, 1), rng)
+    weights = [1 / (rank + 1) for rank in range(len(keys))]
+    stream = rng.choices(keys, weights=weights, k=size)
+    return [], [('count', key, None) for key in stream]
+
+
+WORKLOADS = {
+    'insert': insert_workload,
+    'read': read_workload,
+    'miss': miss_workload,
+    'delete': delete_workload,
+    'mixed': mixed_workload,
+    'churn': churn_workload,
+    'find_mode': find_mode_workload,
+}
+
+
+def numeric_keys(size: int, rng: random.Random) -> list:
+    """Returns the decimal strings of 0 to size - 1.
+    """
+    return [str(i) for i in range(size)]
+
+
+def anagram_keys(size: int, rng: random.Random) -> list:
+    """Returns distinct keys made of groups of up to ten anagrams, which all
+    share the same sum of characters.
+    """
+    keys = set()
+    while len(keys) < size:
+        letters = list(rng.choice(make_keys(1, rng)))
+        for _ in range(10):
+            rng.shuffle(letters)
+            keys.add(''.join(letters))
+    return list(keys)[:size]
+
+
+KEY_SETS = {
+    'random': make_keys,
+    'numeric': numeric_keys,
+    'anagram': anagram_keys,
+}
+
+
+# ------------------- MEASUREMENT ------------------------------------------ #
+
+def apply(hash_map, op: str, key: str, value: object) -> None:
+    """Performs one workload operation on the map.
+    """
+    if op == 'get':
+        hash_map.get(key)
+    elif op == 'put':
+        hash_map.put(key, value)
+    elif op == 'remove':
+        hash_map.remove(key)
+    elif op == 'contains':
+        hash_map.contains_key(key)
+    else:
+        count = 1
+        if hash_map.contains_key(key):
+            count = hash_map.get(key) + 1
+        hash_map.put(key, count)
+
+
+def percentile(ordered: list, fraction: float) -> int:
+    """Returns the nearest-rank percentile of an already sorted list.
+    """
+    if not ordered:
+        return 0
+    rank = max(int(round(fraction * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def run_case(backend: str, function: str, workload: str,
+             size: int, capacity: int, seed: int, key_set: str = 'random') -> dict:
+    """Runs one backend/hash function/workload combination and returns its
+    measurements. Timing and memory tracing are done in separate passes so
+    tracemalloc does not distort the latencies.
+    """
+    preload, ops = WORKLOADS[workload](size, random.Random(seed), KEY_SETS[key_set])
+    map_class, hash_function = BACKENDS[backend], HASH_FUNCTIONS[function]
+
+    # timed pass
+    hash_map = map_class(capacity, hash_function)
+    for key, value in preload:
+        hash_map.put(key, value)
+    # every map counts its own resizes, incremental and in-place ones included
+    resizes = hash_map.stats()['resizes']
+    latencies = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for op, key, value in ops:
+        before = clock()
+        apply(hash_map, op, key, value)
+        latencies.append(clock() - before)
+    elapsed = (clock() - start) / 1e9
+    resizes = hash_map.stats()['resizes'] - resizes
+
+    # memory pass
+    tracemalloc.start()
+    hash_map = map_class(capacity, hash_function)
+    for key, value in preload:
+        hash_map.put(key, value)
+    for op, key, value in ops:
+        apply(hash_map, op, key, value)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'backend': backend,
+        'hash_function': function,
+        'workload': workload,
+        'key_set': key_set,
+        'operations': len(ops),
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(len(ops) / elapsed, 1) if elapsed else None,
+        'latency_ns': {'p50': percentile(latencies, 0.50),
+                       'p99': percentile(latencies, 0.99),
+                       'max': latencies[-1] if latencies else 0},
+        'peak_memory_bytes': peak,
+        'resizes': resizes,
+        'final_size': hash_map.get_size(),
+        'final_capacity': hash_map.get_capacity(),
+    }
+
+
+def bulk_case(backend: str, function: str, size: int, capacity: int,
+              seed: int, key_set: str = 'random') -> dict:
+    """Times put_many, get_many and remove_many against loops of put, get
+    and remove over the same keys, each run on a new map of the backend.
+    """
+    keys = KEY_SETS[key_set](size, random.Random(seed))
+    items = [(key, i) for i, key in enumerate(keys)]
+    map_class, hash_function = BACKENDS[backend], HASH_FUNCTIONS[function]
+    clock = time.perf_counter
+
+    hash_map = map_class(capacity, hash_function)
+    start = clock()
+    for key, value in items:
+        hash_map.put(key, value)
+    put = clock() - start
+    for key in keys:
+        hash_map.get(key)
+    get = clock() - start - put
+    for key in keys:
+        hash_map.remove(key)
+    remove = clock() - start - put - get
+    looped = {'put': put, 'get': get, 'remove': remove}
+
+    hash_map = map_class(capacity, hash_function)
+    start = clock()
+    hash_map.put_many(items)
+    put = clock() - start
+    hash_map.get_many(keys)
+    get = clock() - start - put
+    hash_map.remove_many(keys)
+    remove = clock() - start - put - get
+    batched = {'put': put, 'get': get, 'remove': remove}
+
+    report = {'backend': backend, 'hash_function': function,
+              'key_set': key_set, 'keys': len(keys)}
+    for operation in ('put', 'get', 'remove'):
+        report[operation] = {
+            'loop_seconds': round(looped[operation], 6),
+            'bulk_seconds': round(batched[operation], 6),
+            'speedup': (round(looped[operation] / batched[operation], 3)
+                        if batched[operation] else None)}
+    return report
+
+
+def batch_hash_case(function: str, size: int, seed: int,
+                    key_set: str = 'random') -> dict:
+    """Times hashing a key set with the batch version of a hash function
+    against calling the scalar function on every key, and checks that both
+    give the same hashes.
+    """
+    keys = KEY_SETS[key_set](size, random.Random(seed))
+    hash_function = HASH_FUNCTIONS[function]
+    batch = batch_hash_function(hash_function)
+
+    start = time.perf_counter()
+    expected = [hash_function(key) for key in keys]
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hashes = batch(keys)
+    batched = time.perf_counter() - start
+
+    return {
+        'hash_function': function,
+        'key_set': key_set,
+        'keys': len(keys),
+        # other functions, and every function without NumPy, are batched by
+        # a plain loop
+        'vectorized': (hash_function in BATCH_HASH_FUNCTIONS
+                       and importlib.util.find_spec('numpy') is not None),
+        'scalar_seconds': round(scalar, 6),
+        'batch_seconds': round(batched, 6),
+        'speedup': round(scalar / batched, 3) if batched else None,
+        'same_result': list(hashes) == expected,
+    }
+
+
+def distribution_case(function: str, key_set: str, size: int, seed: int) -> dict:
+    """Spreads a key set over as many buckets as a separate chaining map
+    holding it would have and returns the chi-square statistic of the bucket
+    counts and the longest chain. A uniform hash gives chi_square_per_df near 1.
+    """
+    keys = KEY_SETS[key_set](size, random.Random(seed))
+    hash_function = HASH_FUNCTIONS[function]
+    buckets = hash_map_sc.HashMap(len(keys), hash_function).get_capacity()
+    counts = [0] * buckets
+    for key in keys:
+        counts[hash_function(key) % buckets] += 1
+
+    expected = len(keys) / buckets
+    chi_square = sum((count - expected) ** 2 for count in counts) / expected
+    return {
+        'hash_function': function,
+        'key_set': key_set,
+        'keys': len(keys),
+        'buckets': buckets,
+        'chi_square': round(chi_square, 2),
+        'chi_square_per_df': round(chi_square / (buckets - 1), 4),
+        'max_chain': max(counts),
+        'empty_buckets': counts.count(0),
+    }
+
+
+def threads_case(backend: str, function: str, threads: int,
+                 size: int, capacity: int, seed: int) -> dict:
+    """Runs the mixed workload on one shared map from the given number of
+    threads, each with its own share of the operations, and returns the
+    total throughput.
+    """
+    hash_map = CONCURRENT_BACKENDS[backend](capacity, HASH_FUNCTIONS[function])
+    preload, _ = mixed_workload(size, random.Random(seed))
+    for key, value in preload:
+        hash_map.put(key, value)
+    shares = [mixed_workload(max(size // threads, 1), random.Random(seed + t))[1]
+              for t in range(threads)]
+
+    def run(ops: list) -> None:
+        for op, key, value in ops:
+            apply(hash_map, op, key, value)
+
+    workers = [threading.Thread(target=run, args=(ops,)) for ops in shares]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    operations = sum(len(ops) for ops in shares)
+    return {
+        'backend': backend,
+        'hash_function': function,
+        'threads': threads,
+        'operations': operations,
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(operations / elapsed, 1) if elapsed else None,
+    }
+
+
+def find_mode_case(workers: int, size: int, seed: int,
+                   chunk_size: int = None) -> dict:
+    """Times find_mode_parallel with the given number of workers against
+    find_mode on the skewed stream of the find_mode workload.
+    """
+    _, ops = find_mode_workload(size, random.Random(seed))
+    da = DynamicArray([key for _, key, _ in ops])
+
+    start = time.perf_counter()
+    expected = hash_map_sc.find_mode(da)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = hash_map_sc.find_mode_parallel(da, workers, chunk_size)
+    parallel = time.perf_counter() - start
+
+    return {
+        'workers': workers,
+        'elements': size,
+        'chunk_size': chunk_size,
+        'serial_seconds': round(serial, 6),
+        'parallel_seconds': round(parallel, 6),
+        'speedup': round(serial / parallel, 3) if parallel else None,
+        'same_result': (result[1] == expected[1]
+                        and str(result[0]) == str(expected[0])),
+    }
+
+
+def heavy_hitters_case(counters: int, size: int, seed: int, top: int = 10) -> dict:
+    """Summarizes the skewed stream of the find_mode workload with a
+    SpaceSaving of the given number of counters and compares its mode and
+    top keys, and its memory, with exact counts kept by a ModeCounter.
+    """
+    _, ops = find_mode_workload(size, random.Random(seed))
+    stream = [key for _, key, _ in ops]
+
+    exact = hash_map_sc.ModeCounter()
+    start = time.perf_counter()
+    exact.update(stream)
+    exact_seconds = time.perf_counter() - start
+
+    summary = heavy_hitters.SpaceSaving(counters)
+    start = time.perf_counter()
+    summary.update(stream)
+    approx_seconds = time.perf_counter() - start
+
+    exact_modes, exact_frequency = exact.get_mode()
+    approx_modes, approx_frequency = summary.get_mode()
+    counts = exact.get_keys_and_values()
+    ranked = sorted((counts[i] for i in range(counts.length())),
+                    key=lambda pair: pair[1], reverse=True)
+    exact_top = {key for key, _ in ranked[:top]}
+    approx_top = summary.get_top(top)
+    approx_top = {approx_top[i][0] for i in range(approx_top.length())}
+
+    return {
+        'counters': counters,
+        'elements': size,
+        'distinct_keys': counts.length(),
+        'mode_correct': (sorted(approx_modes.slice(0, approx_modes.length()))
+                         == sorted(exact_modes.slice(0, exact_modes.length()))),
+        'exact_frequency': exact_frequency,
+        'approx_frequency': approx_frequency,
+        'error_bound': summary.error_bound(),
+        'top_recall': len(exact_top & approx_top) / len(exact_top) if exact_top else 1.0,
+        'exact_memory_bytes': exact.memory_usage()['total'],
+        'approx_memory_bytes': summary.memory_usage()['total'],
+        'exact_seconds': round(exact_seconds, 6),
+        'approx_seconds': round(approx_seconds, 6),
+    }
+
+
+def cache_case(policy: str, max_entries: int, size: int, seed: int) -> dict:
+    """Replays the skewed stream of the find_mode workload through a cache of
+    the given policy and size: each key is looked up, and put on a miss.
+    """
+    _, ops = find_mode_workload(size, random.Random(seed))
+    stream = [key for _, key, _ in ops]
+
+    cache = hash_map_cache.Cache(max_entries, policy)
+    capacity = cache.stats()['table_capacity']
+    start = time.perf_counter()
+    for key in stream:
+        if cache.get(key) is None:
+            cache.put(key, key)
+    elapsed = time.perf_counter() - start
+
+    stats = cache.stats()
+    return {
+        'policy': policy,
+        'max_entries': max_entries,
+        'elements': size,
+        'hit_rate': round(stats['hit_rate'], 4),
+        'evictions': stats['evictions'],
+        'resized': stats['table_capacity'] != capacity,
+        'ops_per_sec': round(size / elapsed, 1) if elapsed else None,
+    }
+
+
+def wal_case(sync: str, size: int, seed: int, batch_size: int = 64) -> dict:
+    """Puts size random keys, then removes a tenth of them, through a
+    JournaledHashMap with the given sync policy in a temporary directory, and
+    times reopening it, which replays the log. The log is not compacted.
+    """
+    keys = make_keys(size, random.Random(seed))
+    directory = tempfile.mkdtemp()
+    try:
+        hash_map = hash_map_wal.JournaledHashMap(directory, fnv1a_hash, sync=sync,
+                                                 batch_size=batch_size,
+                                                 compact_bytes=float('inf'))
+        start = time.perf_counter()
+        for i, key in enumerate(keys):
+            hash_map.put(key, i)
+        for key in keys[::10]:
+            hash_map.remove(key)
+        hash_map.close()
+        elapsed = time.perf_counter() - start
+        log_bytes = os.path.getsize(os.path.join(directory, hash_map_wal.LOG_FILE))
+
+        start = time.perf_counter()
+        reopened = hash_map_wal.JournaledHashMap(directory, fnv1a_hash)
+        replay = time.perf_counter() - start
+        reopened.close()
+    finally:
+        shutil.rmtree(directory)
+
+    operations = size + len(keys[::10])
+    return {
+        'sync': sync,
+        'batch_size': batch_size if sync == 'batch' else None,
+        'operations': operations,
+        'ops_per_sec': round(operations / elapsed, 1) if elapsed else None,
+        'log_bytes': log_bytes,
+        'replay_seconds': round(replay, 6),
+        'replayed_size': reopened.get_size(),
+    }
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """Returns the cases whose throughput fell by more than the tolerance
+    (a fraction) relative to the matching case of a baseline run.
+    """
+    previous = {(r['backend'], r['hash_function'], r['workload'],
+                 r.get('key_set', 'random')): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result['backend'], result['hash_function'],
+                            result['workload'], result['key_set']))
+        if not old or not old['ops_per_sec'] or not result['ops_per_sec']:
+            continue
+        change = result['ops_per_sec'] / old['ops_per_sec'] - 1
+        if change < -tolerance:
+            regressions.append({'backend': result['backend'],
+                                'hash_function': result['hash_function'],
+                                'workload': result['workload'],
+                                'baseline_ops_per_sec': old['ops_per_sec'],
+                                'ops_per_sec': result['ops_per_sec'],
+                                'change': round(change, 4)})
+    return regressions
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    """Parses the command line.
+    """
+    parser = argparse.ArgumentParser(description='HashMap benchmarks')
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS),
+                        default=sorted(BACKENDS))
+    parser.add_argument('--functions', nargs='+', choices=sorted(HASH_FUNCTIONS),
+                        default=sorted(HASH_FUNCTIONS))
+    parser.add_argument('--workloads', nargs='+', choices=list(WORKLOADS),
+                        default=list(WORKLOADS))
+    parser.add_argument('--key-set', choices=list(KEY_SETS), default='random',
+                        help='keys the workloads are built from')
+    parser.add_argument('--size', type=int, default=20000,
+                        help='number of keys per workload')
+    parser.add_argument('--capacity', type=int, default=11,
+                        help='initial capacity of every map')
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='JSON report of a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='allowed throughput drop against the baseline')
+    parser.add_argument('--distribution', action='store_true',
+                        help='report bucket distribution quality instead')
+    parser.add_argument('--find-mode-workers', nargs='+', type=int,
+                        help='report find_mode_parallel speedup for these worker counts instead')
+    parser.add_argument('--chunk-size', type=int,
+                        help='elements per find_mode_parallel chunk')
+    parser.add_argument('--heavy-hitters', nargs='+', type=int,
+                        help='compare SpaceSaving summaries with these numbers of counters instead')
+    parser.add_argument('--cache', nargs='+', type=int,
+                        help='report cache hit rates for these numbers of entries instead')
+    parser.add_argument('--wal', action='store_true',
+                        help='report write-ahead log throughput for each sync policy instead')
+    parser.add_argument('--bulk', action='store_true',
+                        help='compare bulk operations with loops of single ones instead')
+    parser.add_argument('--batch-hash', action='store_true',
+                        help='compare batch hash functions with the scalar ones instead')
+    parser.add_argument('--threads', nargs='+', type=int,
+                        help='report thread-safe map throughput for these thread counts instead')
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> int:
+    """Runs the selected benchmarks and prints the JSON report. Returns 1 if
+    a baseline was given and a regression was detected, otherwise 0.
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    status = 0
+    if args.distribution:
+        report = {'distribution': [distribution_case(function, key_set,
+                                                     args.size, args.seed)
+                                   for function in args.functions
+                                   for key_set in KEY_SETS]}
+    elif args.find_mode_workers:
+        report = {'cpus': os.cpu_count(),
+                  'find_mode': [find_mode_case(workers, args.size, args.seed,
+                                               args.chunk_size)
+                                for workers in args.find_mode_workers]}
+    elif args.heavy_hitters:
+        report = {'heavy_hitters': [heavy_hitters_case(counters, args.size, args.seed)
+                                    for counters in args.heavy_hitters]}
+    elif args.cache:
+        report = {'cache': [cache_case(policy, max_entries, args.size, args.seed)
+                            for max_entries in args.cache
+                            for policy in hash_map_cache.POLICIES]}
+    elif args.wal:
+        report = {'wal': [wal_case(sync, args.size, args.seed)
+                          for sync in hash_map_wal.SYNC_POLICIES]}
+    elif args.bulk:
+        report = {'bulk': [bulk_case(backend, function, args.size, args.capacity,
+                                     args.seed, args.key_set)
+                           for backend in args.backends
+                           for function in args.functions]}
+    elif args.batch_hash:
+        report = {'batch_hash': [batch_hash_case(function, args.size, args.seed,
+                                                 args.key_set)
+                                 for function in args.functions]}
+    elif args.threads:
+        report = {'gil_enabled': getattr(sys, '_is_gil_enabled', lambda: True)(),
+                  'threads': [threads_case(backend, function, threads, args.size,
+                                           args.capacity, args.seed)
+                              for backend in CONCURRENT_BACKENDS
+                              for function in args.functions
+                              for threads in args.threads]}
+    else:
+        results = []
+        for backend in args.backends:
+            for function in args.functions:
+                for workload in args.workloads:
+                    results.append(run_case(backend, function, workload,
+                                            args.size, args.capacity, args.seed,
+                                            args.key_set))
+
+        report = {
+            'meta': {'python': platform.python_version(),
+                     'implementation': platform.python_implementation(),
+                     'size': args.size, 'capacity': args.capacity,
+                     'seed': args.seed, 'key_set': args.key_set},
+            'results': results,
+        }
+        if args.baseline:
+            with open(args.baseline) as file:
+                report['regressions'] = compare(results, json.load(file)['results'],
+                                                args.tolerance)
+            status = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Capacity-bounded cache built on the separate chaining HashMap.
+# The map finds the node of a cached key, and an eviction policy keeps the
+# nodes in its own structure and chooses which key to drop once the cache
+# holds max_entries keys:
+#   - 'lru' drops the least recently used key, using a doubly linked list
+#   - 'lfu' drops the least frequently used key (the least recently used among
+#     ties), using a linked list of frequencies each holding a list of keys
+#   - 'clock' gives each key a second chance, using a circular array of
+#     reference bits swept by a hand
+# get, put and remove take O(1) time with every policy. The map is created with
+# room for max_entries keys, so it never resizes.
+
+import hash_map_sc
+from a6_include import hash_function_1, hash_function_2
+
+
+# ------------------- LRU ---------------------------------------------------- #
+
+class _LRUNode:
+    """
+    Node of the LRU list, which is ordered from most to least recently used
+    """
+
+    __slots__ = ('key', 'value', 'prev', 'next')
+
+    def __init__(self, key: str = None, value: object = None) -> None:
+        self.key = key
+        self.value = value
+        self.prev = self
+        self.next = self
+
+
+class LRUPolicy:
+    """
+    Evicts the least recently used key. Nodes form a circular doubly linked
+    list around a sentinel: the most recently used node follows the sentinel.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._sentinel = _LRUNode()
+
+    def _unlink(self, node: _LRUNode) -> None:
+        node.prev.next = node.next
+        node.next.prev = node.prev
+
+    def _push_front(self, node: _LRUNode) -> None:
+        node.prev = self._sentinel
+        node.next = self._sentinel.next
+        self._sentinel.next.prev = node
+        self._sentinel.next = node
+
+    def add(self, key: str, value: object) -> _LRUNode:
+        """Returns the node of a new key, which becomes the most recently used."""
+        node = _LRUNode(key, value)
+        self._push_front(node)
+        return node
+
+    def touch(self, node: _LRUNode) -> None:
+        """Marks a node as the most recently used."""
+        self._unlink(node)
+        self._push_front(node)
+
+    def evict(self) -> _LRUNode:
+        """Unlinks and returns the least recently used node."""
+        node = self._sentinel.prev
+        self._unlink(node)
+        return node
+
+    def discard(self, node: _LRUNode) -> None:
+        """Unlinks a node whose key was removed."""
+        self._unlink(node)
+
+
+# ------------------- LFU ---------------------------------------------------- #
+
+class _LFUNode(_LRUNode):
+    """
+    Node of one key, kept in the list of the frequency it was used with
+    """
+
+    __slots__ = ('frequency',)
+
+
+class _Frequency:
+    """
+    One use count in the LFU frequency list, with the list of keys used that
+    many times, from most to least recently used
+    """
+
+    __slots__ = ('count', 'keys', 'prev', 'next')
+
+    def __init__(self, count: int = 0) -> None:
+        self.count = count
+        self.keys = _LRUNode()
+        self.prev = self
+        self.next = self
+
+
+class LFUPolicy:
+    """
+    Evicts the least frequently used key, and among those the least recently
+    used. The frequencies in use form a circular doubly linked list in
+    increasing order, so the lowest one follows the sentinel.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._sentinel = _Frequency()
+
+    def _frequency_after(self, frequency: _Frequency, count: int) -> _Frequency:
+        """Returns the frequency with the given count, which comes right after
+        the given one, creating it if needed.
+        """
+        following = frequency.next
+        if following is not self._sentinel and following.count == count:
+            return following
+        created = _Frequency(count)
+        created.prev = frequency
+        created.next = following
+        following.prev = created
+        frequency.next = created
+        return created
+
+    def _link(self, node: _LFUNode, frequency: _Frequency) -> None:
+        keys = frequency.keys
+        node.frequency = frequency
+        node.prev = keys
+        node.next = keys.next
+        keys.next.prev = node
+        keys.next = node
+
+    def _unlink(self, node: _LFUNode) -> None:
+        """Takes a node out of its frequency, which is dropped once empty."""
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        frequency = node.frequency
+        if frequency.keys.next is frequency.keys:
+            frequency.prev.next = frequency.next
+            frequency.next.prev = frequency.prev
+
+    def add(self, key: str, value: object) -> _LFUNode:
+        """Returns the node of a new key, which has been used once."""
+        node = _LFUNode(key, value)
+        self._link(node, self._frequency_after(self._sentinel, 1))
+        return node
+
+    def touch(self, node: _LFUNode) -> None:
+        """Moves a node to the frequency one higher than its own."""
+        frequency = node.frequency
+        target = self._frequency_after(frequency, frequency.count + 1)
+        self._unlink(node)
+        self._link(node, target)
+
+    def evict(self) -> _LFUNode:
+        """Unlinks and returns the least recently used node of the lowest
+        frequency.
+        """
+        node = self._sentinel.next.keys.prev
+        self._unlink(node)
+        return node
+
+    def discard(self, node: _LFUNode) -> None:
+        """Unlinks a node whose key was removed."""
+        self._unlink(node)
+
+
+# ------------------- CLOCK -------------------------------------------------- #
+
+class _ClockNode:
+    """
+    Node of one key: its slot in the clock and its reference bit
+    """
+
+    __slots__ = ('key', 'value', 'index', 'referenced')
+
+    def __init__(self, key: str, value: object, index: int) -> None:
+        self.key = key
+        self.value = value
+        self.index = index
+        self.referenced = False
+
+
+class ClockPolicy:
+    """
+    Approximates LRU with one reference bit per key. Keys sit in a circular
+    array of slots. A hand sweeps it, clearing set bits, and evicts the first
+    key whose bit is already clear.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._slots = [None] * max_entries
+        # slots freed by remove, reused before the never used ones
+        self._free = []
+        self._used = 0
+        self._hand = 0
+
+    def add(self, key: str, value: object) -> _ClockNode:
+        """Returns the node of a new key, placed in a free slot."""
+        if self._free:
+            index = self._free.pop()
+        else:
+            index = self._used
+            self._used += 1
+        node = _ClockNode(key, value, index)
+        self._slots[index] = node
+        return node
+
+    def touch(self, node: _ClockNode) -> None:
+        """Sets the reference bit of a node."""
+        node.referenced = True
+
+    def evict(self) -> _ClockNode:
+        """Advances the hand to the first node whose reference bit is clear,
+        clearing the bits it passes, then frees its slot and returns it.
+        """
+        slots, capacity = self._slots, len(self._slots)
+        while True:
+            node = slots[self._hand]
+            self._hand = (self._hand + 1) % capacity
+            if node is None:
+                continue
+            if node.referenced:
+                node.referenced = False
+                continue
+            slots[node.index] = None
+            self._free.append(node.index)
+            return node
+
+    def discard(self, node: _ClockNode) -> None:
+        """Frees the slot of a node whose key was removed."""
+        self._slots[node.index] = None
+        self._free.append(node.index)
+
+
+POLICIES = {
+    'lru': LRUPolicy,
+    'lfu': LFUPolicy,
+    'clock': ClockPolicy,
+}
+
+
+# ------------------- CACHE -------------------------------------------------- #
+
+class Cache:
+    def __init__(self, max_entries: int, policy='lru',
+                 function: callable = hash_function_1) -> None:
+        """
+        Initialize an empty cache that holds at most max_entries keys. policy
+        is a name from POLICIES, or a class with the same methods as them
+        that is created with max_entries.
+        """
+        self._max_entries = max(max_entries, 1)
+        if isinstance(policy, str):
+            policy = POLICIES[policy]
+        self._policy = policy(self._max_entries)
+
+        # an SC map only grows once its load factor reaches 1, and the cache
+        # evicts before it holds more than max_entries keys
+        self._map = hash_map_sc.HashMap(self._max_entries + 1, function)
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_size(self) -> int:
+        """Returns the number of cached keys.
+        """
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """Returns the most keys the cache holds.
+        """
+        return self._max_entries
+
+    def get(self, key: str) -> object:
+        """Returns the value cached for a key, or None on a miss. A hit counts
+        as a use of the key for the eviction policy.
+        """
+        node = self._map.get(key)
+        if node is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._policy.touch(node)
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """Return true if key is cached. Otherwise, False. Neither counted as
+        a hit or miss nor as a use of the key.
+        """
+        return self._map.get(key) is not None
+
+    def put(self, key: str, value: object) -> None:
+        """Caches the value of a key. A new key evicts another one first if
+        the cache is full.
+        """
+        node = self._map.get(key)
+        if node is not None:
+            node.value = value
+            self._policy.touch(node)
+            return
+
+        if self._map.get_size() >= self._max_entries:
+            victim = self._policy.evict()
+            self._map.remove(victim.key)
+            self._evictions += 1
+        self._map.put(key, self._policy.add(key, value))
+
+    def remove(self, key: str) -> None:
+        """Removes a key from the cache.
+        """
+        node = self._map.get(key)
+        if node is not None:
+            self._policy.discard(node)
+            self._map.remove(key)
+
+    def stats(self) -> dict:
+        """Returns a plain dict with the size and capacity of the cache, its
+        hits, misses and hit rate (over get calls), its evictions and the
+        capacity of its HashMap.
+        """
+        lookups = self._hits + self._misses
+        return {'size': self._map.get_size(),
+                'max_entries': self._max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'table_capacity': self._map.get_capacity()}
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRU example")
+    print("-----------")
+    cache = Cache(3, 'lru')
+    for key in ['a', 'b', 'c']:
+        cache.put(key, key.upper())
+    cache.get('a')
+    cache.put('d', 'D')
+    print([key for key in 'abcd' if cache.contains_key(key)], cache.stats())
+
+    print("\nLFU example")
+    print("-----------")
+    cache = Cache(3, 'lfu')
+    for key in ['a', 'b', 'c']:
+        cache.put(key, key.upper())
+    for key in ['a', 'a', 'b', 'c']:
+        cache.get(key)
+    cache.put('d', 'D')
+    cache.put('e', 'E')
+    print([key for key in 'abcde' if cache.contains_key(key)], cache.stats())
+
+    print("\nCLOCK example")
+    print("-------------")
+    cache = Cache(3, 'clock', hash_function_2)
+    for key in ['a', 'b', 'c']:
+        cache.put(key, key.upper())
+    cache.get('b')
+    cache.put('d', 'D')
+    cache.put('e', 'E')
+    print([key for key in 'abcde' if cache.contains_key(key)], cache.stats())
+
+    print("\nNo resize example")
+    print("-----------------")
+    cache = Cache(100, 'lru')
+    capacity = cache._map.get_capacity()
+    for i in range(10000):
+        cache.put('key' + str(i % 250), i)
+        cache.get('key' + str(i % 170))
+    print(cache.get_size(), cache._map.get_capacity() == capacity, cache.stats()['evictions'])
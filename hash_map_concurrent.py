@@ -0,0 +1,364 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Thread-safe separate chaining HashMap using lock striping. The
+# buckets are split into stripes (bucket index modulo the number of stripes)
+# and each stripe has its own lock, so operations on keys in different stripes
+# never wait for each other. put, get and remove lock only the stripe of their
+# key. Operations on the whole table, such as resize_table, clear and the
+# reporting methods, take every stripe in order. The size, and the count of
+# changes that iterators check, are kept as one counter per stripe. On
+# free-threaded CPython builds, threads working on different stripes run in
+# parallel. The public API matches hash_map_sc.HashMap.
+
+import random
+import threading
+from contextlib import contextmanager
+
+import hash_map_sc
+from a6_include import (DynamicArray, batch_hash_function, hash_function_1,
+                        hash_function_2)
+
+
+class HashMap(hash_map_sc.HashMap):
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 stripes: int = 16,
+                 power_of_two: bool = False) -> None:
+        """
+        Initialize new thread-safe HashMap that uses separate chaining for
+        collision resolution, with one lock per stripe of buckets.
+        """
+        super().__init__(capacity, function, power_of_two=power_of_two)
+        self._stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._counts = [0] * stripes
+        # keys added or removed per stripe, summed by _mutations, as one
+        # shared counter would lose increments made under different locks
+        self._mutation_counts = [0] * stripes
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as hash_map_sc
+        """
+        with self._all_stripes():
+            return super().__str__()
+
+    @contextmanager
+    def _all_stripes(self):
+        """ Holds every stripe lock, taken in order so two callers never
+        deadlock. Inside, _size holds the total of the stripe counters, and
+        afterwards the counters are rebuilt from it.
+        """
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            self._size = sum(self._counts)
+            yield
+        finally:
+            self._counts = [self._size] + [0] * (self._stripes - 1)
+            for lock in reversed(self._locks):
+                lock.release()
+
+    @property
+    def _mutations(self) -> int:
+        """ Total of the stripe mutation counters, which iterators compare.
+        """
+        return sum(self._mutation_counts)
+
+    @_mutations.setter
+    def _mutations(self, value: int) -> None:
+        """ Set by the whole-table operations of hash_map_sc, which run while
+        every stripe is held, so the change is added to the first stripe.
+        """
+        self._mutation_counts[0] += value - sum(self._mutation_counts)
+
+    def _index(self, key_hash: int) -> int:
+        """ Returns the bucket index of a hash in the current table.
+        """
+        return key_hash & self._mask if self._mask else key_hash % self._capacity
+
+    def _lock_stripe(self, key_hash: int) -> int:
+        """ Acquires the lock of the stripe holding a hash's bucket and returns
+        the stripe. The index is checked again under the lock, since a resize
+        could have moved the bucket to another stripe in between.
+        """
+        locks, stripes = self._locks, self._stripes
+        while True:
+            stripe = self._index(key_hash) % stripes
+            locks[stripe].acquire()
+            if self._index(key_hash) % stripes == stripe:
+                return stripe
+            locks[stripe].release()
+
+    # ------------------------------------------------------------------ #
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._counts)
+
+    def table_load(self) -> float:
+        """Returns the current hash table load factor.
+        """
+        return sum(self._counts)/self._capacity
+
+    def put(self, key: str, value: object) -> None:
+        """ Updates the key/value pair. If the given key already exists, its
+        value is updated to the new value. If absent, a new key/value pair is added.
+        """
+        self._put(key, value, self._hash_function(key))
+
+    def _put(self, key: str, value: object, key_hash: int) -> None:
+        """ Stores the key/value pair under its stripe lock, then grows the
+        table if the load factor reached 1.
+        """
+        stripe = self._lock_stripe(key_hash)
+        try:
+            bucket = self._buckets[self._index(key_hash)]
+            node = bucket.contains(key, key_hash)
+            if node:
+                node.value = value
+            else:
+                bucket.insert(key, value, key_hash)
+                self._counts[stripe] += 1
+                self._mutation_counts[stripe] += 1
+            capacity = self._capacity
+        finally:
+            self._locks[stripe].release()
+
+        if sum(self._counts) >= capacity:
+            self._grow_from(capacity)
+
+    def _grow_from(self, capacity: int) -> None:
+        """ Doubles the capacity, unless another thread already grew the table
+        since it had the given capacity.
+        """
+        with self._all_stripes():
+            if self._capacity == capacity:
+                super().resize_table(capacity*2)
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """ Adds amount to the count stored for a key (0 if absent) under its
+        stripe lock and returns the new count.
+        """
+        key_hash = self._hash_function(key)
+        stripe = self._lock_stripe(key_hash)
+        try:
+            bucket = self._buckets[self._index(key_hash)]
+            node = bucket.contains(key, key_hash)
+            if node:
+                node.value += amount
+                count = node.value
+            else:
+                bucket.insert(key, amount, key_hash)
+                self._counts[stripe] += 1
+                self._mutation_counts[stripe] += 1
+                count = amount
+            capacity = self._capacity
+        finally:
+            self._locks[stripe].release()
+
+        if sum(self._counts) >= capacity:
+            self._grow_from(capacity)
+        return count
+
+    def put_many(self, items) -> None:
+        """ Puts every (key, value) pair of an iterable. The table is resized
+        at most once up front, and all keys are hashed in one batch.
+        """
+        items = list(items)
+        keys = [key for key, _ in items]
+        needed = sum(self._counts) + len(set(keys))
+        if needed > self._capacity:
+            self.resize_table(needed)
+
+        hashes = batch_hash_function(self._hash_function)(keys)
+        for (key, value), key_hash in zip(items, hashes):
+            self._put(key, value, key_hash)
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key.
+        """
+        return self._get(key, self._hash_function(key))
+
+    def _get(self, key: str, key_hash: int) -> object:
+        """ Looks a key up under its stripe lock.
+        """
+        stripe = self._lock_stripe(key_hash)
+        try:
+            node = self._buckets[self._index(key_hash)].contains(key, key_hash)
+        finally:
+            self._locks[stripe].release()
+        return node.value if node else None
+
+    def get_many(self, keys) -> DynamicArray:
+        """ Returns a dynamic array with the value of every given key, in
+        order. Missing keys give None.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        return DynamicArray([self._get(key, key_hash)
+                             for key, key_hash in zip(keys, hashes)])
+
+    def remove(self, key: str) -> None:
+        """Removes key/value pair from the hash map
+        """
+        self._remove(key, self._hash_function(key))
+
+    def _remove(self, key: str, key_hash: int) -> None:
+        """ Removes a key under its stripe lock.
+        """
+        stripe = self._lock_stripe(key_hash)
+        try:
+            if self._buckets[self._index(key_hash)].remove(key, key_hash):
+                self._counts[stripe] -= 1
+                self._mutation_counts[stripe] += 1
+        finally:
+            self._locks[stripe].release()
+
+    def remove_many(self, keys) -> None:
+        """ Removes every given key/value pair from the hash map.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        for key, key_hash in zip(keys, hashes):
+            self._remove(key, key_hash)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """Changes the capacity of the internal hash table while holding every
+        stripe, so no operation sees a half-moved table.
+        """
+        with self._all_stripes():
+            super().resize_table(new_capacity)
+
+    def empty_buckets(self) -> int:
+        """Returns the number of empty buckets in the hash table.
+        """
+        with self._all_stripes():
+            return super().empty_buckets()
+
+    def clear(self, shrink_to: int = None) -> None:
+        """Clears the contents. Capacity is not affected, unless shrink_to
+        gives a new one.
+        """
+        with self._all_stripes():
+            super().clear(shrink_to)
+
+    def stats(self) -> dict:
+        """Returns the same plain dict as hash_map_sc, taken while holding
+        every stripe.
+        """
+        with self._all_stripes():
+            return super().stats()
+
+    def memory_usage(self) -> dict:
+        """Returns the same breakdown as hash_map_sc, taken while holding
+        every stripe. The locks are not counted.
+        """
+        with self._all_stripes():
+            return super().memory_usage()
+
+    def save(self, path: str) -> None:
+        """Writes a binary snapshot of the map to path while holding every
+        stripe.
+        """
+        with self._all_stripes():
+            super().save(path)
+
+    def _load_entries(self, entries: list) -> None:
+        """ Inserts (key, value, hash) tuples while holding every stripe, so
+        the stripe counters are rebuilt from the new size.
+        """
+        with self._all_stripes():
+            # grown here, as resize_table would wait for the stripes held
+            if self._size + len(entries) > self._capacity:
+                super().resize_table(self._size + len(entries))
+            super()._load_entries(entries)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array where each index contains a tuple of a
+        key/value pair stored in the hash map. Order of keys does not matter.
+        """
+        with self._all_stripes():
+            return super().get_keys_and_values()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - put example 2")
+    print("-------------------")
+    m = HashMap(41, hash_function_2)
+    for i in range(50):
+        m.put('str' + str(i // 3), i * 100)
+        if i % 10 == 9:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nStress test - 8 threads")
+    print("-----------------------")
+    # every thread owns its own keys, so the final contents are known, while
+    # all of them read a shared set of keys and force resizes on the way
+    m = HashMap(11, hash_function_2, stripes=8)
+    shared = ['shared' + str(i) for i in range(200)]
+    m.put_many((key, key) for key in shared)
+    errors = []
+
+    def worker(thread: int) -> None:
+        rng = random.Random(thread)
+        own = {}
+        for i in range(3000):
+            key = 't%d-%d' % (thread, rng.randrange(500))
+            roll = rng.random()
+            if roll < 0.5:
+                changes[thread] += key not in own
+                m.put(key, i)
+                own[key] = i
+            elif roll < 0.7:
+                changes[thread] += key in own
+                m.remove(key)
+                own.pop(key, None)
+            elif m.get(key) != own.get(key):
+                errors.append(key)
+            shared_key = rng.choice(shared)
+            if m.get(shared_key) != shared_key:
+                errors.append(shared_key)
+        if rng.random() < 0.5:
+            m.resize_table(m.get_capacity() // 2)
+        for key, value in own.items():
+            if m.get(key) != value:
+                errors.append(key)
+        results[thread] = len(own)
+
+    results = [0] * 8
+    # keys each thread added or removed, so no change is lost by the counters
+    changes = [0] * 8
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [], errors
+    assert m.get_size() == sum(results) + len(shared)
+    assert m.get_keys_and_values().length() == m.get_size()
+    assert m._mutations == len(shared) + sum(changes) + m.stats()['resizes']
+    print("passed")
@@ -0,0 +1,409 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: HashMap using bucketized cuckoo hashing. Every key can live
+# in one of two buckets of four slots: the first is picked from the map's
+# hash function, the second from a seeded keyed hash that is independent of
+# it. Keys that cannot be placed after a bounded number of evictions go to a
+# small stash, and when the stash is full the table is rebuilt with a new
+# seed. A lookup therefore checks at most two buckets and the stash, which
+# bounds its cost no matter how the keys collide. The public API matches
+# hash_map_oa.HashMap, so either class can be used.
+
+import random
+import sys
+
+import hash_map_oa
+from a6_include import (ConcurrentModificationException, DynamicArray,
+                        HashEntry, batch_hash_function, hash_function_1,
+                        hash_function_2, make_keyed_hash, next_power_of_two)
+
+SLOTS_PER_BUCKET = 4
+STASH_SIZE = 4
+MAX_EVICTIONS = 64
+
+# 2**64 divided by the golden ratio. Multiplying by it spreads the input bits
+# over the high bits of the 64-bit product.
+_FIBONACCI = 0x9e3779b97f4a7c15
+_MASK_64 = 0xffffffffffffffff
+
+
+class HashMap(hash_map_oa.HashMap):
+    def __init__(self, capacity: int, function,
+                 max_load: float = 0.85,
+                 seed: int = 0,
+                 shrink_load: float = 0.0) -> None:
+        """
+        Initialize new HashMap that uses cuckoo hashing with buckets of four
+        slots. The capacity is rounded up to a power of two number of buckets,
+        and the table doubles once the load factor reaches max_load.
+        With shrink_load, remove shrinks the table once the load factor
+        falls below it; 0 never shrinks.
+        Unlike hash_map_oa, it takes no probing or instrument option.
+        """
+        self._seed = seed
+        self._alt_hash_function = make_keyed_hash(seed)
+        self._random = random.Random(seed)
+
+        # cuckoo hashing never leaves tombstones, so there is nothing to compact
+        super().__init__(capacity, function, compact_threshold=1,
+                         shrink_load=shrink_load)
+        # a key has two buckets, not a probe sequence
+        self._probing = None
+
+        # the table doubles once the load factor reaches _max_load
+        self._max_load = max_load
+
+        # capped against this map's own _max_load (see hash_map_oa)
+        self._shrink_load = min(shrink_load, max_load / 4)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide output like hash_map_oa's, followed
+        by the stash
+        """
+        out = ''
+        for i in range(self._capacity):
+            entry = None
+            if self._keys[i] is not None:
+                entry = HashEntry(self._keys[i], self._values[i], self._hashes[i])
+            out += str(i) + ': ' + str(entry) + '\n'
+        for key, value, key_hash, _ in self._stash:
+            out += 'stash: ' + str(HashEntry(key, value, key_hash)) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """ Creates an empty table of the given capacity. Empty slots hold
+        None as their key.
+        """
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = [None] * capacity
+        self._alt_hashes = [None] * capacity
+        self._stash = []
+
+        buckets = capacity // SLOTS_PER_BUCKET
+        self._bucket_mask = buckets - 1
+        # the top bits of a 64-bit product select one of the buckets
+        self._shift = 64 - buckets.bit_length() + 1
+
+    # ------------------------------------------------------------------ #
+    def _round_capacity(self, capacity: int) -> int:
+        """ Returns the capacity of a table of at least the given size: a
+        power of two number of buckets.
+        """
+        buckets = next_power_of_two(-(-capacity // SLOTS_PER_BUCKET))
+        return buckets * SLOTS_PER_BUCKET
+
+    # a new table is rounded the same way as a resized one
+    _initial_capacity = _round_capacity
+
+    def _first_bucket(self, key_hash: int) -> int:
+        """ Returns the first slot of the bucket picked by the map's hash.
+        """
+        spread = (((key_hash ^ self._seed) & _MASK_64) * _FIBONACCI) & _MASK_64
+        return (spread >> self._shift) * SLOTS_PER_BUCKET
+
+    def _second_bucket(self, alt_hash: int) -> int:
+        """ Returns the first slot of the bucket picked by the keyed hash.
+        """
+        return (alt_hash & self._bucket_mask) * SLOTS_PER_BUCKET
+
+    def calc_index(self, key: str) -> int:
+        """ Calculates the first slot of the key's first bucket.
+        """
+        return self._first_bucket(self._hash_function(key))
+
+    def _find(self, key: str, key_hash: int) -> int:
+        """ Returns the index of the key's slot, -(position + 2) if it is in
+        the stash, or -1 if it is absent. Checks at most two buckets and the stash.
+        """
+        keys = self._keys
+        # a bucket is sliced out so its keys are compared in C
+        start = self._first_bucket(key_hash)
+        bucket = keys[start:start + SLOTS_PER_BUCKET]
+        if key in bucket:
+            return start + bucket.index(key)
+
+        # the keyed hash is only computed when the first bucket misses
+        start = self._second_bucket(self._alt_hash_function(key))
+        bucket = keys[start:start + SLOTS_PER_BUCKET]
+        if key in bucket:
+            return start + bucket.index(key)
+
+        if self._stash:
+            for position in range(len(self._stash)):
+                if self._stash[position][0] == key:
+                    return -position - 2
+        return -1
+
+    def _probe(self, key: str, key_hash: int) -> (int, int):
+        """ Returns the index of the key's slot (-1 if absent) and -1, as no
+        probe sequence is walked.
+        """
+        index = self._find(key, key_hash)
+        return (index if index >= 0 else -1), -1
+
+    def _insert(self, key: str, value: object, key_hash: int) -> None:
+        """ Updates the value of an existing key, or places a new entry. The
+        table is rebuilt if the entry finds no place.
+        """
+        index = self._find(key, key_hash)
+        if index >= 0:
+            self._values[index] = value
+            return
+        if index < -1:
+            position = -index - 2
+            self._stash[position] = (key, value, key_hash, self._stash[position][3])
+            return
+
+        self._size += 1
+        self._mutations += 1
+        homeless = self._place((key, value, key_hash, self._alt_hash_function(key)))
+        if homeless is not None:
+            self._rebuild(self._capacity, self._entries() + [homeless], True)
+
+    def _place(self, entry: tuple) -> tuple:
+        """ Stores a (key, value, hash, keyed hash) entry in a free slot of one
+        of its buckets. If both are full, entries are evicted to their other
+        bucket at most MAX_EVICTIONS times, and then the one left over goes to
+        the stash. Returns that entry if the stash is full too, otherwise None.
+        """
+        keys = self._keys
+        first = self._first_bucket(entry[2])
+        second = self._second_bucket(entry[3])
+        for start in (first, second):
+            for index in range(start, start + SLOTS_PER_BUCKET):
+                if keys[index] is None:
+                    self._store(index, entry)
+                    return None
+
+        start = first if self._random.random() < 0.5 else second
+        for _ in range(MAX_EVICTIONS):
+            index = start + self._random.randrange(SLOTS_PER_BUCKET)
+            evicted = (keys[index], self._values[index],
+                       self._hashes[index], self._alt_hashes[index])
+            self._store(index, entry)
+            entry = evicted
+
+            # the evicted entry moves to its other bucket
+            first = self._first_bucket(entry[2])
+            start = self._second_bucket(entry[3]) if start == first else first
+            for index in range(start, start + SLOTS_PER_BUCKET):
+                if keys[index] is None:
+                    self._store(index, entry)
+                    return None
+
+        if len(self._stash) < STASH_SIZE:
+            self._stash.append(entry)
+            return None
+        return entry
+
+    def _store(self, index: int, entry: tuple) -> None:
+        """ Writes an entry into a slot.
+        """
+        self._keys[index], self._values[index], \
+            self._hashes[index], self._alt_hashes[index] = entry
+
+    def _entries(self) -> list:
+        """ Returns every stored entry, stash included, as (key, value, hash,
+        keyed hash) tuples.
+        """
+        keys = self._keys
+        entries = [(keys[i], self._values[i], self._hashes[i], self._alt_hashes[i])
+                   for i in range(self._capacity) if keys[i] is not None]
+        return entries + self._stash
+
+    def _rebuild(self, capacity: int, entries: list, reseed: bool) -> None:
+        """ Places the entries into a new table of the given capacity. While
+        some entry finds no place, the keyed hash gets a new seed, and every
+        fourth attempt the capacity doubles as well. Keys with equal hashes
+        share a first bucket whatever the seed, so with a weak hash function
+        the doubling, not the load factor, sets the capacity (see README).
+        """
+        self._mutations += 1
+        self._resizes += 1
+        attempts = 0
+        while True:
+            if reseed:
+                self._seed += 1
+                self._alt_hash_function = make_keyed_hash(self._seed)
+                entries = [(key, value, key_hash, self._alt_hash_function(key))
+                           for key, value, key_hash, _ in entries]
+
+            self._capacity = capacity
+            self._allocate(capacity)
+            homeless = None
+            for i in range(len(entries)):
+                homeless = self._place(entries[i])
+                if homeless is not None:
+                    break
+            if homeless is None:
+                return
+
+            entries = self._entries() + [homeless] + entries[i + 1:]
+            reseed = True
+            attempts += 1
+            if attempts % 4 == 0:
+                capacity *= 2
+
+    def get_many(self, keys) -> DynamicArray:
+        """ Returns a dynamic array with the value of every given key, in
+        order. Missing keys give None.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        return DynamicArray([self._value_at(self._find(key, key_hash))
+                             for key, key_hash in zip(keys, hashes)])
+
+    def _value_at(self, index: int) -> object:
+        """ Returns the value at an index returned by _find, or None if -1.
+        """
+        if index >= 0:
+            return self._values[index]
+        if index < -1:
+            return self._stash[-index - 2][1]
+        return None
+
+    def remove_many(self, keys) -> None:
+        """ Removes every given key/value pair from the hash map.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        for key, key_hash in zip(keys, hashes):
+            self._remove(key, key_hash)
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def empty_buckets(self) -> int:
+        """Returns the number of empty slots in the hash table.
+        """
+        return self._keys.count(None)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """ Changes the capacity of the internal hash table and places every
+        entry again using its stored hashes.
+        """
+        if new_capacity < self._size:
+            return
+
+        # the final capacity is worked out up front so the load stays below _max_load
+        new_capacity = self._round_capacity(new_capacity)
+        while self._size and (self._size - 1) / new_capacity >= self._max_load:
+            new_capacity *= 2
+
+        self._rebuild(new_capacity, self._entries(), False)
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key
+        """
+        return self._value_at(self._find(key, self._hash_function(key)))
+
+    def contains_key(self, key: str) -> bool:
+        """ Return true if key exists in hashmap. Otherwise, False.
+        """
+        return self.get(key) is not None
+
+    def remove(self, key: str) -> None:
+        """Removes key/value pair from the hash map.
+        """
+        self._remove(key, self._hash_function(key))
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def _remove(self, key: str, key_hash: int) -> None:
+        """ Empties the slot or stash entry of a key.
+        """
+        index = self._find(key, key_hash)
+        if index == -1:
+            return
+
+        if index >= 0:
+            self._store(index, (None, None, None, None))
+        else:
+            self._stash.pop(-index - 2)
+        self._size -= 1
+        self._mutations += 1
+
+    def clear(self, shrink_to: int = None) -> None:
+        """Clears the contents. Capacity is not affected, unless shrink_to
+        gives a new one.
+        """
+        if shrink_to is not None:
+            self._capacity = self._round_capacity(max(shrink_to, 1))
+        self._allocate(self._capacity)
+        self._size = 0
+        self._mutations += 1
+
+    def memory_usage(self) -> dict:
+        """Returns the bytes used by the slot lists and the stash, by the
+        cached hashes, by the keys and by the values, along with their total.
+        """
+        usage = {'buckets': sum(sys.getsizeof(part) for part in
+                                (self._keys, self._values, self._hashes,
+                                 self._alt_hashes, self._stash)),
+                 'entries': 0, 'keys': 0, 'values': 0}
+        for key, value, key_hash, alt_hash in self._entries():
+            usage['entries'] += sys.getsizeof(key_hash) + sys.getsizeof(alt_hash)
+            usage['keys'] += sys.getsizeof(key)
+            usage['values'] += sys.getsizeof(value)
+
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array where each index contains a tuple of a
+        key/value pair stored in the hash map. Order of keys does not matter.
+        """
+        return DynamicArray([(key, value) for key, value, _, _ in self._entries()])
+
+    def __iter__(self):
+        """ Returns a new iterator over every stored key, stash included, as
+        HashEntry objects built on the fly, which walks the slots lazily. It
+        raises ConcurrentModificationException if a key is added or removed,
+        or the table rebuilt, during the loop.
+        """
+        mutations = self._mutations
+        keys, values, hashes = self._keys, self._values, self._hashes
+        for i in range(self._capacity):
+            if keys[i] is not None:
+                yield HashEntry(keys[i], values[i], hashes[i])
+                if self._mutations != mutations:
+                    raise ConcurrentModificationException
+        for key, value, key_hash, _ in list(self._stash):
+            yield HashEntry(key, value, key_hash)
+            if self._mutations != mutations:
+                raise ConcurrentModificationException
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
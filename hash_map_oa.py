@@ -4,33 +4,101 @@
 # Assignment: 6
 # Due Date: 3/17/2023
 # Description: The HashMap class is build on a dynamic array and uses
-# open addressing, specifically quadratic probing, to stores key-value
-# pairs. Class methods include checking the table load factor, getting
+# open addressing, quadratic probing by default, to stores key-value
+# pairs. Linear, triangular and double hashing probe sequences can be
+# chosen instead. Class methods include checking the table load factor, getting
 # info on the number of empty buckets, resizing the table, retrieving
 # (i.e. getting) a value using a key, checking if table contains a key,
-# removing stored data, clearing the table, getting a dynamic array of
-# key/value pairs and iterating through Hashmap class.
-
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+# removing stored data, clearing the table, reporting memory usage, getting a
+# dynamic array of key/value pairs and iterating through Hashmap class.
+
+import math
+import sys
+import time
+
+from a6_include import (ConcurrentModificationException, DynamicArray,
+                        HashEntry, MapView, batch_hash_function,
+                        hash_function_1, hash_function_2, make_mixed_hash,
+                        next_power_of_two, next_prime)
+from hash_map_stats import MapStats
+
+# probe sequences are walked with additive steps: the step between two probed
+# slots starts at 1 (or at the key's second hash for double hashing) and
+# grows by the strategy's delta after every probe
+PROBE_DELTAS = {
+    'linear': 0,
+    'quadratic': 2,
+    'triangular': 1,
+    'double': 0,
+}
+
+# 2**64 divided by the golden ratio. Multiplying by it spreads the input bits
+# over the high bits of the 64-bit product.
+_FIBONACCI = 0x9e3779b97f4a7c15
+_MASK_64 = 0xffffffffffffffff
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function,
+                 compact_threshold: float = 0.75,
+                 power_of_two: bool = False,
+                 probing: str = None,
+                 instrument: bool = False,
+                 shrink_load: float = 0.0) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        quadratic probing for collision resolution.
+        The table is rehashed in place once active entries plus tombstones
+        reach compact_threshold of the capacity.
+        With power_of_two, capacities are powers of two indexed with a mask,
+        hashes are mixed first and triangular probing is used instead.
+        probing picks another probe sequence from PROBE_DELTAS.
+        With instrument, operations are counted for stats().
+        With shrink_load, remove shrinks the table once the load factor
+        falls below it; 0 never shrinks.
         """
-        self._buckets = DynamicArray()
+        # capacity must be a prime number, or a power of two
+        self._power_of_two = power_of_two
+        self._capacity = self._initial_capacity(capacity)
+        self._mask = self._capacity - 1 if power_of_two else 0
+        self._allocate(self._capacity)
+
+        # triangular numbers visit every slot of a power-of-two table, and
+        # quadratic probing reaches half the slots of a prime one
+        if probing is None:
+            probing = 'triangular' if power_of_two else 'quadratic'
+        if probing not in PROBE_DELTAS:
+            raise ValueError(f"probing must be one of {', '.join(PROBE_DELTAS)}, "
+                             f"not {probing!r}")
+        self._probing = probing
+        self._probe_delta = PROBE_DELTAS[probing]
+        self._double_hashing = probing == 'double'
+
+        # a mask only sees the low bits, so every bit of the hash is mixed in
+        self._hash_function = make_mixed_hash(function) if power_of_two else function
+        self._size = 0
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        # removed entries stay in the table as tombstones until a rehash
+        self._tombstones = 0
+        self._compact_threshold = compact_threshold
 
-        self._hash_function = function
-        self._size = 0
+        # the table doubles once the load factor reaches _max_load
+        self._max_load = 0.5
+
+        # the table shrinks to half of _max_load once the load falls below
+        # _shrink_load, but never below the initial capacity. Capped at a
+        # quarter of _max_load, a shrunk map must lose half its keys again
+        # before the next shrink, or double them before the next growth.
+        self._shrink_load = min(shrink_load, self._max_load / 4)
+        self._min_capacity = self._capacity
+
+        # MapStats of an instrumented map, and the resizes and in-place
+        # rehashes of the table so far, see stats()
+        self._stats = MapStats() if instrument else None
+        self._resizes = 0
+        # counts added and removed keys, clears and rebuilds of the table, so
+        # an iterator can tell that the map changed under it
+        self._mutations = 0
 
     def __str__(self) -> str:
         """
@@ -90,9 +158,35 @@ class HashMap:
         return self._capacity
 
     # ------------------------------------------------------------------ #
+    def _initial_capacity(self, capacity: int) -> int:
+        """ Returns the capacity a new table of the given size gets. Unlike
+        _round_capacity, a prime table never starts at 2.
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        return next_prime(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        """ Creates an empty table of the given capacity. Subclasses with
+        another table layout override it.
+        """
+        self._buckets = DynamicArray([None] * capacity)
+
+    def _round_capacity(self, capacity: int) -> int:
+        """ Returns the capacity a table of at least the given size gets under
+        the capacity policy. Note: 2 is a prime number
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if capacity == 2:
+            return capacity
+        return next_prime(capacity)
+
     def calc_index(self, key: str) -> int:
         """ Calculates the appropriate array index using provided key.
         """
+        if self._mask:
+            return self._hash_function(key) & self._mask
         return self._hash_function(key) % self._capacity
 
     def quad_probe(self, initial_index: int, j: int) -> int:
@@ -100,64 +194,186 @@ class HashMap:
         """
         return (initial_index + j**2) % self._capacity
 
+    def _second_hash(self, key_hash: int) -> int:
+        """ Returns the step of a key's double hashing probe sequence. It is
+        taken from the high bits of the Fibonacci hash of the stored hash, so
+        resizing never rehashes the key, and it is coprime with the capacity.
+        """
+        second = ((key_hash * _FIBONACCI) & _MASK_64) >> 32
+        if self._mask:
+            # odd steps visit every slot of a power-of-two table
+            return second | 1
+        # any step below a prime capacity visits every slot
+        return 1 + second % (self._capacity - 1) if self._capacity > 1 else 1
+
+    def _probe(self, key: str, key_hash: int) -> (int, int):
+        """ Walks the probe sequence of a key, comparing stored hashes
+        before keys. Returns the index of the key's active entry (-1 if absent)
+        and the first empty slot or tombstone a new entry could use (-1 if none).
+        """
+        capacity, mask, delta = self._capacity, self._mask, self._probe_delta
+        index = key_hash & mask if mask else key_hash % capacity
+        step = self._second_hash(key_hash) if self._double_hashing else 1
+        free = -1
+        increment = 0
+        while increment < capacity:
+            entry = self._buckets[index]
+            if entry is None:
+                return -1, (index if free == -1 else free)
+            if entry.is_tombstone is True:
+                # first tombstone is where a new entry would be inserted
+                if free == -1:
+                    free = index
+            elif entry.hash == key_hash and entry.key == key:
+                return index, free
+            increment += 1
+            # e.g. quadratic: (i + j**2) - (i + (j-1)**2) = 2j - 1
+            index = (index + step) & mask if mask else (index + step) % capacity
+            step += delta
+        return -1, free
+
+    def _counted_probe(self, operation: str, key: str, key_hash: int) -> (int, int):
+        """ Walks the probe sequence of a key like _probe, and records the
+        slots visited under operation. Used by instrumented maps only.
+        """
+        capacity, mask, delta = self._capacity, self._mask, self._probe_delta
+        index = key_hash & mask if mask else key_hash % capacity
+        step = self._second_hash(key_hash) if self._double_hashing else 1
+        free = -1
+        probes = 0
+        while probes < capacity:
+            entry = self._buckets[index]
+            probes += 1
+            if entry is None:
+                self._stats.record(operation, probes, False)
+                return -1, (index if free == -1 else free)
+            if entry.is_tombstone is True:
+                if free == -1:
+                    free = index
+            elif entry.hash == key_hash and entry.key == key:
+                self._stats.record(operation, probes, True)
+                return index, free
+            index = (index + step) & mask if mask else (index + step) % capacity
+            step += delta
+        self._stats.record(operation, probes, False)
+        return -1, free
+
     def put(self, key: str, value: object) -> None:
         """ Updates the key/value pair. If the given key already exists, its
         value is updated to the new value. If absent, a new key/value pair is added.
         """
-        if self.table_load() >= 0.5:
+        if self.table_load() >= self._max_load:
             self.resize_table(self._capacity * 2)
+        elif self._tombstones and \
+                (self._size + self._tombstones) / self._capacity >= self._compact_threshold:
+            # probe sequences are clogged with tombstones. Rehashes in place.
+            self.resize_table(self._capacity)
 
-        # initial insertion
-        i = self.calc_index(key)
-        if self._buckets[i] is None:
-            self._buckets[i] = HashEntry(key, value)
-            self._size += 1
-        # tombstones are valid for new entries that are not inactive keys
-        elif self._buckets[i].key != key and self._buckets[i].is_tombstone is True:
-            self._buckets[i].is_tombstone = False
-            self._buckets[i] = HashEntry(key, value)
-            self._size += 1
-        # checks for already existing key
-        elif self._buckets[i].key == key:
-            # key exists but is inactive (is_tombstone)
-            if self._buckets[i].is_tombstone is True:
-                self._buckets[i].is_tombstone = False
-                self._size += 1
-            else:
-                # key exists and value is updated
-                self._buckets[i].value = value
+        # the full hash is kept in the entry so resizing never rehashes the key
+        self._insert(key, value, self._hash_function(key))
+
+    def _insert(self, key: str, value: object, key_hash: int) -> None:
+        """ Stores the key/value pair, reusing the first tombstone of its probe
+        sequence. The caller makes sure the table has room.
+        """
+        if self._stats is None:
+            index, free = self._probe(key, key_hash)
         else:
-            # insertion via quadratic probing starts after 1st attempt to insert fails
-            increment = 1
-            quad_i = self.quad_probe(i, increment)
-            while self._buckets[quad_i] is not None:
-                # tombstones are valid for new entries that are not inactive keys
-                if self._buckets[quad_i].key != key and self._buckets[quad_i].is_tombstone is True:
-                    # not a tombstone when new value is inserted
-                    self._buckets[quad_i].is_tombstone = False
-                    break
-                # checks for already existing key
-                elif self._buckets[quad_i].key == key:
-                    # inactive key exists. Activates entry.
-                    if self._buckets[quad_i].is_tombstone is True:
-                        self._buckets[quad_i].is_tombstone = False
-                        self._size += 1
-                        return
-                    else:
-                        # active key exists and value is updated
-                        self._buckets[quad_i].value = value
-                        return
-                increment += 1
-                quad_i = self.quad_probe(i, increment)
-
-            self._buckets[quad_i] = HashEntry(key, value)
-            self._size += 1
+            index, free = self._counted_probe('put', key, key_hash)
+        if index != -1:
+            # key exists and value is updated
+            self._buckets[index].value = value
+            return
+
+        if free == -1:
+            # probe sequence reached no usable slot. Grows the table and retries.
+            self.resize_table(self._capacity * 2)
+            index, free = self._probe(key, key_hash)
+
+        if self._buckets[free] is not None:
+            # new entry takes the place of a tombstone
+            self._tombstones -= 1
+        self._buckets[free] = HashEntry(key, value, key_hash)
+        self._size += 1
+        self._mutations += 1
+
+    def put_many(self, items) -> None:
+        """ Puts every (key, value) pair of an iterable. The table is resized
+        at most once, for the final number of keys, and all keys are hashed up front.
+        """
+        items = list(items)
+        keys = [key for key, _ in items]
+        needed = self._size + len(set(keys))
+        if needed / self._capacity >= self._max_load:
+            self.resize_table(math.ceil(needed / self._max_load))
+        elif self._tombstones and \
+                (needed + self._tombstones) / self._capacity >= self._compact_threshold:
+            self.resize_table(self._capacity)
+
+        hashes = batch_hash_function(self._hash_function)(keys)
+        for (key, value), key_hash in zip(items, hashes):
+            self._insert(key, value, key_hash)
+
+    def get_many(self, keys) -> DynamicArray:
+        """ Returns a dynamic array with the value of every given key, in
+        order. Missing keys give None.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        values = []
+        for key, key_hash in zip(keys, hashes):
+            if self._stats is None:
+                index, _ = self._probe(key, key_hash)
+            else:
+                index, _ = self._counted_probe('get', key, key_hash)
+            values.append(None if index == -1 else self._buckets[index].value)
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """ Removes every given key/value pair from the hash map.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        for key, key_hash in zip(keys, hashes):
+            if self._stats is None:
+                index, _ = self._probe(key, key_hash)
+            else:
+                index, _ = self._counted_probe('remove', key, key_hash)
+            if index != -1:
+                self._buckets[index].is_tombstone = True
+                self._size -= 1
+                self._tombstones += 1
+                self._mutations += 1
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
 
     def table_load(self) -> float:
         """Returns the current hash table load factor.
         """
         return self._size/self._capacity
 
+    def tombstone_ratio(self) -> float:
+        """Returns the fraction of the hash table occupied by tombstones.
+        """
+        return self._tombstones/self._capacity
+
+    def stats(self) -> dict:
+        """Returns a plain dict describing the table: size, capacity, load,
+        tombstones and the number of resizes. For a map created with
+        instrument=True, it also holds per-operation calls, probes and hit
+        ratios, a histogram of probe lengths as (length, count) pairs, and the
+        time spent resizing.
+        """
+        report = {'enabled': self._stats is not None,
+                  'size': self._size,
+                  'capacity': self._capacity,
+                  'load': self.table_load(),
+                  'tombstones': self._tombstones,
+                  'resizes': self._resizes}
+        if self._stats is not None:
+            report.update(self._stats.to_dict())
+        return report
+
     def empty_buckets(self) -> int:
         """Returns the number of empty buckets in the hash table.
         """
@@ -169,57 +385,71 @@ class HashMap:
         return empty
 
     def resize_table(self, new_capacity: int) -> None:
-        """ Changes the capacity of the internal hash table and
-        rehashes entries to insert into the new table.
+        """ Changes the capacity of the internal hash table and moves active
+        entries into the new table using their stored hashes.
         """
         if new_capacity < self._size:
             return
 
+        start = time.perf_counter() if self._stats is not None else 0.0
+        self._mutations += 1
+        self._resizes += 1
         prev_buckets = self._buckets
 
-        # determines a prime number capacity. Note: 2 is a prime number
-        if new_capacity != 2:
-            new_capacity = self._next_prime(new_capacity)
+        # determines a prime number (or power of two) capacity
+        new_capacity = self._round_capacity(new_capacity)
+
+        # re-inserting through put() would double the table whenever the load
+        # reached _max_load, so the final capacity is worked out up front instead
+        while self._size and (self._size - 1) / new_capacity >= self._max_load:
+            new_capacity = self._round_capacity(new_capacity * 2)
 
         # creates new table
         self._buckets = DynamicArray()
         self._capacity = new_capacity
-        self._size = 0
+        self._mask = new_capacity - 1 if self._power_of_two else 0
+        self._tombstones = 0
         for _ in range(self._capacity):
             self._buckets.append(None)
 
-        # copies over active entries (not tombstones) from previous to new table
+        # moves active entries (not tombstones) from previous to new table
         for i in range(prev_buckets.length()):
             entry = prev_buckets[i]
             if entry is not None and entry.is_tombstone is False:
-                self.put(entry.key, entry.value)
+                self._place(entry)
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def _place(self, entry: HashEntry) -> None:
+        """ Stores an entry in the first empty slot of its probe sequence.
+        Only used while rebuilding a table, which holds no tombstones or duplicates.
+        """
+        capacity, mask, delta = self._capacity, self._mask, self._probe_delta
+        index = entry.hash & mask if mask else entry.hash % capacity
+        step = self._second_hash(entry.hash) if self._double_hashing else 1
+        while self._buckets[index] is not None:
+            index = (index + step) & mask if mask else (index + step) % capacity
+            step += delta
+        self._buckets[index] = entry
 
     def get(self, key: str) -> object:
         """Returns the value associated with the given key
         """
-
-        # initial search
-        i = self.calc_index(key)
-        if self._buckets[i] is None:
-            return None
-        elif self._buckets[i].key == key and self._buckets[i].is_tombstone is False:
-            return self._buckets[i].value
+        if self._stats is None:
+            index, _ = self._probe(key, self._hash_function(key))
         else:
-            # quadratic probing starts after 1st search attempt fails
-            increment = 1
-            quad_i = self.quad_probe(i, increment)
-            while self._buckets[quad_i] is not None:
-                if self._buckets[quad_i].key == key and self._buckets[quad_i].is_tombstone is False:
-                    return self._buckets[quad_i].value
-                increment += 1
-                quad_i = self.quad_probe(i, increment)
-
-        # when an empty slot in the table is reached
-        return None
+            index, _ = self._counted_probe('get', key, self._hash_function(key))
+        if index == -1:
+            return None
+        return self._buckets[index].value
 
     def contains_key(self, key: str) -> bool:
         """ Return true if key exists in hashmap. Otherwise, False.
         """
+        if self._stats is not None:
+            index, _ = self._counted_probe('contains', key, self._hash_function(key))
+            return index != -1 and self._buckets[index].value is not None
         if self.get(key) is not None:
             return True
         else:
@@ -228,39 +458,98 @@ class HashMap:
     def remove(self, key: str) -> None:
         """Removes key/value pair from the hash map.
         """
-        index = self.calc_index(key)
-        if self._buckets[index] is None:
-            return
-        elif self._buckets[index].key == key:
-            if self._buckets[index].is_tombstone is False:
-                # updates tombstone flag to indicate value is "removed"
-                self._buckets[index].is_tombstone = True
-                self._size -= 1
-            else:
-                return
+        if self._stats is None:
+            index, _ = self._probe(key, self._hash_function(key))
         else:
-            # quadratic probing starts after 1st search attempt fails
-            increment = 1
-            quad_index = self.quad_probe(index, increment)
-            while self._buckets[quad_index] is not None:
-                if self._buckets[quad_index].key == key:
-                    if self._buckets[quad_index].is_tombstone is False:
-                        # updates tombstone flag to indicate value is "removed"
-                        self._buckets[quad_index].is_tombstone = True
-                        self._size -= 1
-                        break
-                    else:
-                        return
-                increment += 1
-                quad_index = self.quad_probe(index, increment)
-
-    def clear(self) -> None:
-        """Clears the contents. Capacity is not affected.
+            index, _ = self._counted_probe('remove', key, self._hash_function(key))
+        if index != -1:
+            # updates tombstone flag to indicate value is "removed"
+            self._buckets[index].is_tombstone = True
+            self._size -= 1
+            self._tombstones += 1
+            self._mutations += 1
+            if self._size < self._shrink_load * self._capacity:
+                self._shrink()
+
+    def _shrink(self) -> None:
+        """ Shrinks the table to half of _max_load, or to the initial capacity
+        if that is larger. Tombstones are dropped on the way.
+        """
+        capacity = self._round_capacity(
+            max(self._min_capacity, int(self._size / (self._max_load / 2)) + 1))
+        if capacity < self._capacity:
+            self.resize_table(capacity)
+
+    def clear(self, shrink_to: int = None) -> None:
+        """Clears the contents. Capacity is not affected, unless shrink_to
+        gives a new one.
         """
+        if shrink_to is not None:
+            self._capacity = self._round_capacity(max(shrink_to, 1))
+            self._mask = self._capacity - 1 if self._power_of_two else 0
+            self._buckets = DynamicArray([None] * self._capacity)
+        else:
+            for i in range(self._capacity):
+                if self._buckets[i] is not None:
+                    self._buckets[i] = None
+        # tombstones are not counted in size, so both counters are reset
+        self._size = 0
+        self._tombstones = 0
+        self._mutations += 1
+
+    def compact(self) -> None:
+        """Rehashes the table, dropping every tombstone, at the smallest
+        capacity that keeps the load factor at half of _max_load. Capacity
+        is never increased.
+        """
+        capacity = self._round_capacity(int(self.get_size() / (self._max_load / 2)) + 1)
+        self.resize_table(min(capacity, self._capacity))
+
+    def memory_usage(self) -> dict:
+        """Returns the bytes used by the bucket array, the entries (tombstones
+        included) and their cached hashes, the keys and the values, along with
+        their total. Objects shared between entries, such as small ints, are
+        counted once per entry.
+        """
+        usage = {'buckets': sys.getsizeof(self._buckets), 'entries': 0,
+                 'keys': 0, 'values': 0}
         for i in range(self._capacity):
-            if self._buckets[i] is not None:
-                self._buckets[i] = None
-                self._size -= 1
+            entry = self._buckets[i]
+            if entry is None:
+                continue
+            usage['entries'] += sys.getsizeof(entry) + sys.getsizeof(entry.hash)
+            usage['keys'] += sys.getsizeof(entry.key)
+            usage['values'] += sys.getsizeof(entry.value)
+
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def save(self, path: str) -> None:
+        """Writes a binary snapshot of the map to path (see hash_map_snapshot).
+        """
+        # imported here, as hash_map_snapshot imports this module
+        import hash_map_snapshot
+        hash_map_snapshot.save(self, path)
+
+    @classmethod
+    def load(cls, path: str, function=hash_function_1, **options):
+        """Returns a MappedHashMap serving lookups from a snapshot file, which
+        turns into a HashMap of this class, created with options, once it is
+        changed.
+        """
+        import hash_map_snapshot
+        return hash_map_snapshot.load(path, function, cls, **options)
+
+    def _load_entries(self, entries: list) -> None:
+        """ Inserts (key, value, hash) tuples of distinct keys with their
+        stored hashes, growing the table at most once up front.
+        """
+        needed = self._size + len(entries)
+        if needed / self._capacity >= self._max_load:
+            self.resize_table(math.ceil(needed / self._max_load))
+
+        for key, value, key_hash in entries:
+            self._insert(key, value, key_hash)
 
     def get_keys_and_values(self) -> DynamicArray:
         """Returns a dynamic array where each index contains a tuple of a
@@ -278,28 +567,34 @@ class HashMap:
         return da
 
     def __iter__(self):
-        """ Create iterator for looping through HashMap object
+        """ Returns a new iterator over the active hash entries (i.e. not
+        tombstones), which walks the table lazily. It raises
+        ConcurrentModificationException if a key is added or removed, or the
+        table rebuilt, during the loop.
         """
-        self._index = 0
-        return self
+        mutations = self._mutations
+        buckets = self._buckets
+        for i in range(self._capacity):
+            entry = buckets[i]
+            if entry is not None and entry.is_tombstone is False:
+                yield entry
+                if self._mutations != mutations:
+                    raise ConcurrentModificationException
 
-    def __next__(self):
-        """Obtain next value and advance iterator.
-        Returns active hash entries (i.e. not tombstones).
+    def keys(self) -> MapView:
+        """Returns a lazy view of the keys.
         """
-        try:
-            value = self._buckets[self._index]
-            # ignores inactive hash entries
-            while value is None or value.is_tombstone is True:
-                self._index = self._index + 1
-                value = self._buckets[self._index]
-        except DynamicArrayException:
-            raise StopIteration
+        return MapView(self, 'keys')
 
-        # sets up iterator for next value
-        self._index = self._index + 1
+    def values(self) -> MapView:
+        """Returns a lazy view of the values.
+        """
+        return MapView(self, 'values')
 
-        return value
+    def items(self) -> MapView:
+        """Returns a lazy view of the (key, value) pairs.
+        """
+        return MapView(self, 'items')
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -390,7 +685,8 @@ if __name__ == "__main__":
 
         if m.table_load() > 0.5:
             print(f"Check that the load factor is acceptable after the call to resize_table().\n"
-                  f"Your load factor is {round(m.table_load(), 2)} and should be less than or equal to 0.5")
+                  f"Your load factor is {round(m.table_load(), 2)} and should be less than "
+                  f"or equal to 0.5")
 
         m.put('some key', 'some value')
         result = m.contains_key('some key')
@@ -522,3 +818,27 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nShrink example")
+    print("---------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(500):
+        m.put('str' + str(i), i)
+    for i in range(480):
+        m.remove('str' + str(i))
+    print(m.get_size(), m.get_capacity(), round(m.tombstone_ratio(), 2))
+    m.compact()
+    print(m.get_size(), m.get_capacity(), round(m.tombstone_ratio(), 2))
+
+    print("\nViews example")
+    print("---------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(6):
+        m.put('str' + str(i), i)
+    print(sorted(m.keys()), sum(m.values()), len(m.items()))
+    print([chunk.length() for chunk in m.items().chunks(4)])
+    try:
+        for key in m.keys():
+            m.remove(key)
+    except ConcurrentModificationException:
+        print("ConcurrentModificationException")
@@ -0,0 +1,306 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Open addressing HashMap with a struct-of-arrays layout. Instead
+# of one HashEntry object per slot, the table is kept in parallel arrays:
+# hashes in an array('Q'), keys and values in lists and the slot state (empty,
+# live or tombstone) in a bytearray. Probing compares a byte and an integer
+# before ever touching a key, and removing a key is a single byte write. The
+# public API matches hash_map_oa.HashMap, so either class can be used.
+
+import sys
+from array import array
+
+import hash_map_oa
+from a6_include import (ConcurrentModificationException, DynamicArray,
+                        HashEntry, batch_hash_function, hash_function_1,
+                        hash_function_2)
+
+# slot states
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# hashes are stored as unsigned 64-bit integers
+_MASK_64 = 0xffffffffffffffff
+
+
+class HashMap(hash_map_oa.HashMap):
+    def __init__(self, capacity: int, function,
+                 compact_threshold: float = 0.75,
+                 power_of_two: bool = False,
+                 shrink_load: float = 0.0) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and stores its table in parallel arrays.
+        The table is rehashed in place once active entries plus tombstones
+        reach compact_threshold of the capacity.
+        With power_of_two, capacities are powers of two indexed with a mask,
+        hashes are mixed first and triangular probing is used instead.
+        With shrink_load, remove shrinks the table once the load factor
+        falls below it; 0 never shrinks.
+        Unlike hash_map_oa, it takes no probing or instrument option.
+        """
+        # the arrays are created by _allocate, in place of the HashEntry table
+        super().__init__(capacity, function, compact_threshold=compact_threshold,
+                         power_of_two=power_of_two, shrink_load=shrink_load)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as hash_map_oa
+        """
+        out = ''
+        for i in range(self._capacity):
+            entry = None
+            if self._states[i] != EMPTY:
+                entry = HashEntry(self._keys[i], self._values[i], self._hashes[i])
+                entry.is_tombstone = self._states[i] == TOMBSTONE
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """ Creates an empty table of the given capacity.
+        """
+        self._states = bytearray(capacity)
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    # ------------------------------------------------------------------ #
+    def _probe(self, key: str, key_hash: int) -> (int, int):
+        """ Walks the quadratic probe sequence of a key, comparing stored hashes
+        before keys. Returns the index of the key's live slot (-1 if absent)
+        and the first empty slot or tombstone a new entry could use (-1 if none).
+        """
+        capacity, mask = self._capacity, self._mask
+        states, hashes, keys = self._states, self._hashes, self._keys
+        index = key_hash & mask if mask else key_hash % capacity
+        free = -1
+        increment = 0
+        while increment < capacity:
+            state = states[index]
+            if state == EMPTY:
+                return -1, (index if free == -1 else free)
+            if state == TOMBSTONE:
+                # first tombstone is where a new entry would be inserted
+                if free == -1:
+                    free = index
+            elif hashes[index] == key_hash and keys[index] == key:
+                return index, free
+            increment += 1
+            if mask:
+                # triangular numbers visit every slot of a power-of-two table
+                index = (index + increment) & mask
+            else:
+                # (i + j**2) - (i + (j-1)**2) = 2j - 1
+                index = (index + 2 * increment - 1) % capacity
+        return -1, free
+
+    def _insert(self, key: str, value: object, key_hash: int) -> None:
+        """ Stores the key/value pair, reusing the first tombstone of its probe
+        sequence. The caller makes sure the table has room.
+        """
+        key_hash &= _MASK_64
+        index, free = self._probe(key, key_hash)
+        if index != -1:
+            # key exists and value is updated
+            self._values[index] = value
+            return
+
+        if free == -1:
+            # probe sequence reached no usable slot. Grows the table and retries.
+            self.resize_table(self._capacity * 2)
+            index, free = self._probe(key, key_hash)
+
+        if self._states[free] == TOMBSTONE:
+            # new entry takes the place of a tombstone
+            self._tombstones -= 1
+        self._states[free] = LIVE
+        self._hashes[free] = key_hash
+        self._keys[free] = key
+        self._values[free] = value
+        self._size += 1
+        self._mutations += 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """ Returns a dynamic array with the value of every given key, in
+        order. Missing keys give None.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        values = []
+        for key, key_hash in zip(keys, hashes):
+            index, _ = self._probe(key, key_hash & _MASK_64)
+            values.append(None if index == -1 else self._values[index])
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """ Removes every given key/value pair from the hash map.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        for key, key_hash in zip(keys, hashes):
+            self._remove(key, key_hash & _MASK_64)
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def empty_buckets(self) -> int:
+        """Returns the number of empty buckets in the hash table.
+        """
+        return self._states.count(EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """ Changes the capacity of the internal hash table and moves live
+        entries into the new arrays using their stored hashes.
+        """
+        if new_capacity < self._size:
+            return
+
+        self._mutations += 1
+        self._resizes += 1
+        states, hashes = self._states, self._hashes
+        keys, values = self._keys, self._values
+
+        # determines a prime number (or power of two) capacity
+        new_capacity = self._round_capacity(new_capacity)
+
+        # the final capacity is worked out up front so the load stays below _max_load
+        while self._size and (self._size - 1) / new_capacity >= self._max_load:
+            new_capacity = self._round_capacity(new_capacity * 2)
+
+        self._capacity = new_capacity
+        self._mask = mask = new_capacity - 1 if self._power_of_two else 0
+        self._tombstones = 0
+        self._allocate(new_capacity)
+
+        # moves live entries (not tombstones) into the first empty slot of
+        # their probe sequence. The new table holds no tombstones or duplicates.
+        new_states, new_hashes = self._states, self._hashes
+        new_keys, new_values = self._keys, self._values
+        for i in range(len(states)):
+            if states[i] != LIVE:
+                continue
+            key_hash = hashes[i]
+            index = key_hash & mask if mask else key_hash % new_capacity
+            increment = 0
+            while new_states[index] != EMPTY:
+                increment += 1
+                if mask:
+                    index = (index + increment) & mask
+                else:
+                    index = (index + 2 * increment - 1) % new_capacity
+            new_states[index] = LIVE
+            new_hashes[index] = key_hash
+            new_keys[index] = keys[i]
+            new_values[index] = values[i]
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key
+        """
+        index, _ = self._probe(key, self._hash_function(key) & _MASK_64)
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def remove(self, key: str) -> None:
+        """Removes key/value pair from the hash map.
+        """
+        self._remove(key, self._hash_function(key) & _MASK_64)
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def _remove(self, key: str, key_hash: int) -> None:
+        """ Turns the live slot of a key into a tombstone with a single
+        byte write.
+        """
+        index, _ = self._probe(key, key_hash)
+        if index != -1:
+            self._states[index] = TOMBSTONE
+            self._size -= 1
+            self._tombstones += 1
+            self._mutations += 1
+
+    def clear(self, shrink_to: int = None) -> None:
+        """Clears the contents. Capacity is not affected, unless shrink_to
+        gives a new one.
+        """
+        if shrink_to is not None:
+            self._capacity = self._round_capacity(max(shrink_to, 1))
+            self._mask = self._capacity - 1 if self._power_of_two else 0
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._mutations += 1
+
+    def memory_usage(self) -> dict:
+        """Returns the bytes used by the parallel arrays, which hold the
+        hashes themselves, by the keys and by the values, along with their
+        total. There are no per-entry objects, so entries is always 0.
+        """
+        usage = {'buckets': sum(sys.getsizeof(part) for part in
+                                (self._states, self._hashes, self._keys, self._values)),
+                 'entries': 0, 'keys': 0, 'values': 0}
+        states, keys, values = self._states, self._keys, self._values
+        for i in range(self._capacity):
+            if states[i] != EMPTY:
+                usage['keys'] += sys.getsizeof(keys[i])
+                usage['values'] += sys.getsizeof(values[i])
+
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array where each index contains a tuple of a
+        key/value pair stored in the hash map. Order of keys does not matter.
+        """
+        states, keys, values = self._states, self._keys, self._values
+        return DynamicArray([(keys[i], values[i])
+                             for i in range(self._capacity) if states[i] == LIVE])
+
+    def __iter__(self):
+        """ Returns a new iterator over the live slots, as HashEntry objects
+        built on the fly, which walks the arrays lazily. It raises
+        ConcurrentModificationException if a key is added or removed, or the
+        table rebuilt, during the loop.
+        """
+        mutations = self._mutations
+        states, hashes = self._states, self._hashes
+        keys, values = self._keys, self._values
+        for i in range(self._capacity):
+            if states[i] == LIVE:
+                yield HashEntry(keys[i], values[i], hashes[i])
+                if self._mutations != mutations:
+                    raise ConcurrentModificationException
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
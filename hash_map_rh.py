@@ -0,0 +1,180 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Open addressing HashMap using Robin Hood hashing. Entries are
+# placed by linear probing, but an entry that is further from its home slot
+# takes the slot of one that is closer to its own, which keeps probe lengths
+# short and even. A lookup stops as soon as it meets an entry closer to home
+# than the key would be, and remove shifts the following entries back instead
+# of leaving tombstones. This lets the table run at much higher load factors.
+# The public API matches hash_map_oa.HashMap, so either class can be used.
+
+import hash_map_oa
+from a6_include import (HashEntry, batch_hash_function, hash_function_1,
+                        hash_function_2, make_mixed_hash)
+
+
+class HashMap(hash_map_oa.HashMap):
+    def __init__(self, capacity: int, function,
+                 max_load: float = 0.8,
+                 power_of_two: bool = False,
+                 shrink_load: float = 0.0) -> None:
+        """
+        Initialize new HashMap that uses Robin Hood hashing for collision
+        resolution. The table doubles once the load factor reaches max_load,
+        which must be between 0 and 1. Raises ValueError otherwise.
+        With shrink_load, remove shrinks the table once the load factor
+        falls below it; 0 never shrinks.
+        """
+        # a full table would never end a probe, which stops at an empty slot
+        if not 0 < max_load < 1:
+            raise ValueError(max_load)
+        super().__init__(capacity, function, power_of_two=power_of_two)
+        self._max_load = max_load
+        # capped against this map's own _max_load (see hash_map_oa)
+        self._shrink_load = min(shrink_load, max_load / 4)
+
+        # linear probing merges the runs of nearby hashes into long clusters,
+        # so hashes are always mixed, not only for power-of-two tables
+        self._hash_function = make_mixed_hash(function)
+
+    # ------------------------------------------------------------------ #
+    def _probe(self, key: str, key_hash: int) -> (int, int):
+        """ Walks the linear probe sequence of a key. Returns the index of the
+        key's entry (-1 if absent) and, if absent, the slot where the walk stopped.
+        """
+        buckets, capacity, mask = self._buckets, self._capacity, self._mask
+        index = key_hash & mask if mask else key_hash % capacity
+        distance = 0
+        while True:
+            entry = buckets[index]
+            if entry is None:
+                return -1, index
+            if entry.hash == key_hash and entry.key == key:
+                return index, -1
+
+            # an entry closer to its home slot means the key is not stored
+            home = entry.hash & mask if mask else entry.hash % capacity
+            if (index - home) % capacity < distance:
+                return -1, index
+
+            index += 1
+            if index == capacity:
+                index = 0
+            distance += 1
+
+    def _insert(self, key: str, value: object, key_hash: int) -> None:
+        """ Updates the value of an existing key, or places a new entry
+        starting from the slot where the lookup stopped.
+        """
+        index, stop = self._probe(key, key_hash)
+        if index != -1:
+            # key exists and value is updated
+            self._buckets[index].value = value
+            return
+
+        home = key_hash & self._mask if self._mask else key_hash % self._capacity
+        self._place(HashEntry(key, value, key_hash), stop,
+                    (stop - home) % self._capacity)
+        self._size += 1
+        self._mutations += 1
+
+    def _place(self, entry: HashEntry, index: int = -1, distance: int = 0) -> None:
+        """ Stores an entry that is not in the table yet, from its home slot
+        or from the given slot and distance. Whenever the entry being placed
+        is further from home than the one in a slot, they swap and placement
+        continues with the displaced entry.
+        """
+        buckets, capacity, mask = self._buckets, self._capacity, self._mask
+        if index == -1:
+            index = entry.hash & mask if mask else entry.hash % capacity
+        while True:
+            current = buckets[index]
+            if current is None:
+                buckets[index] = entry
+                return
+
+            home = current.hash & mask if mask else current.hash % capacity
+            current_distance = (index - home) % capacity
+            if current_distance < distance:
+                buckets[index] = entry
+                entry, distance = current, current_distance
+
+            index += 1
+            if index == capacity:
+                index = 0
+            distance += 1
+
+    def remove(self, key: str) -> None:
+        """Removes key/value pair from the hash map.
+        """
+        self._remove(key, self._hash_function(key))
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def remove_many(self, keys) -> None:
+        """ Removes every given key/value pair from the hash map.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        for key, key_hash in zip(keys, hashes):
+            self._remove(key, key_hash)
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def _remove(self, key: str, key_hash: int) -> None:
+        """ Removes the entry of a key and shifts the entries after it back by
+        one slot, until an empty slot or an entry in its home slot.
+        """
+        index, _ = self._probe(key, key_hash)
+        if index == -1:
+            return
+
+        buckets, capacity, mask = self._buckets, self._capacity, self._mask
+        following = index + 1 if index + 1 < capacity else 0
+        entry = buckets[following]
+        while entry is not None:
+            home = entry.hash & mask if mask else entry.hash % capacity
+            if home == following:
+                break
+            buckets[index] = entry
+            index = following
+            following = index + 1 if index + 1 < capacity else 0
+            entry = buckets[following]
+
+        buckets[index] = None
+        self._size -= 1
+        self._mutations += 1
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
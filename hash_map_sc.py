@@ -8,33 +8,89 @@
 # are stored in the SLL of its indexed bucket. Class methods include checking
 # the table load factor, getting info on the number of empty buckets, resizing
 # the table, retrieving (i.e. getting) a value using a key, checking if table
-# contains a key,  removing stored data, clearing the table, and getting a
-# dynamic array of key/value pairs. There is a method out of the class that uses
-# the Hashmap class to find the most occurring string and its frequency.
+# contains a key,  removing stored data, clearing the table, reporting memory
+# usage, and getting a dynamic array of key/value pairs. There is a method out
+# of the class that uses the Hashmap class to find the most occurring string
+# and its frequency.
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from a6_include import (ConcurrentModificationException, DynamicArray,
+                        LinkedList, MapView, SLNode, batch_hash_function,
+                        hash_function_1, hash_function_2, make_mixed_hash,
+                        next_power_of_two, next_prime)
+from hash_map_stats import OPERATIONS, MapStats
+
+
+# load factor a table shrinks to: half the load factor of 1 it grows at
+SHRINK_TARGET = 0.5
 
 
 class HashMap:
+    # MapStats of an instrumented map, see stats()
+    _stats = None
+    # resizes of the table so far, incremental ones included, see stats()
+    _resizes = 0
+    # counts added and removed keys, clears and rebuilds of the table, so an
+    # iterator can tell that the map changed under it
+    _mutations = 0
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental_resize: int = 0,
+                 power_of_two: bool = False,
+                 instrument: bool = False,
+                 shrink_load: float = 0.0) -> None:
         """
         Initialize new HashMap that uses
-        separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        separate chaining for collision resolution.
+        incremental_resize is the number of old buckets migrated per
+        put/get/remove while the table grows; 0 grows it all at once.
+        With power_of_two, capacities are powers of two indexed with a mask
+        and hashes are mixed first.
+        With instrument, operations are counted for stats().
+        With shrink_load, remove shrinks the table once the load factor
+        falls below it; 0 never shrinks.
         """
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number, or a power of two
+        self._power_of_two = power_of_two
+        if power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = next_prime(capacity)
+        self._mask = self._capacity - 1 if power_of_two else 0
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
-        self._hash_function = function
+        # a mask only sees the low bits, so every bit of the hash is mixed in
+        self._hash_function = make_mixed_hash(function) if power_of_two else function
         self._size = 0
 
+        # old table kept alive while an incremental resize is in progress.
+        # Old buckets below _migrated have already been moved to _buckets,
+        # and new buckets below _allocated hold a LinkedList.
+        self._incremental_resize = incremental_resize
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrated = 0
+        self._allocated = 0
+
+        # the table shrinks to a load of SHRINK_TARGET once the load falls
+        # below _shrink_load, but never below the initial capacity. Capped at
+        # half the target, a shrunk map must lose half its keys again before
+        # the next shrink, or double them before the next growth.
+        self._shrink_load = min(shrink_load, SHRINK_TARGET / 2)
+        self._min_capacity = self._capacity
+
+        if instrument:
+            self._stats = MapStats(OPERATIONS + ('increment',))
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -93,30 +149,250 @@ class HashMap:
         return self._capacity
 
     # ------------------------------------------------------------------ #
+    def _round_capacity(self, capacity: int) -> int:
+        """ Returns the capacity a table of at least the given size gets under
+        the capacity policy. Note: 2 is a prime number
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if capacity == 2:
+            return capacity
+        return next_prime(capacity)
+
+    def _set_capacity(self, capacity: int) -> None:
+        """ Records a new table capacity along with its index mask.
+        """
+        self._capacity = capacity
+        self._mask = capacity - 1 if self._power_of_two else 0
+
     def calc_index(self, key: str) -> int:
         """ Calculates the appropriate array index using provided key.
         """
+        if self._mask:
+            return self._hash_function(key) & self._mask
         return self._hash_function(key) % self._capacity
 
+    def _walk(self, operation: str, bucket: LinkedList, key: str,
+              key_hash: int) -> SLNode:
+        """ Returns the node of a key in its bucket like bucket.contains, and
+        records the nodes compared under operation. Used by instrumented maps only.
+        """
+        probes = 0
+        for node in bucket:
+            probes += 1
+            if node.hash == key_hash and node.key == key:
+                self._stats.record(operation, probes, True)
+                return node
+        self._stats.record(operation, probes, False)
+        return None
+
     def put(self, key: str, value: object) -> None:
         """ Updates the key/value pair. If the given key already exists, its
         value is updated to the new value. If absent, a new key/value pair is added.
         """
         if self.table_load() >= 1:
-            self.resize_table(self._capacity*2)
+            self._grow()
+
+        # the full hash is kept in the node so resizing never rehashes the key
+        key_hash = self._hash_function(key)
+        if self._old_buckets is not None:
+            bucket = self._migrating_bucket(key_hash)
+        elif self._mask:
+            bucket = self._buckets[key_hash & self._mask]
+        else:
+            bucket = self._buckets[key_hash % self._capacity]
+        self._insert(bucket, key, value, key_hash)
 
-        index = self.calc_index(key)
-        node = self._buckets[index].contains(key)
+    def _insert(self, bucket: LinkedList, key: str, value: object,
+                key_hash: int) -> None:
+        """ Stores the key/value pair in the bucket its hash belongs to.
+        """
+        if self._stats is None:
+            node = bucket.contains(key, key_hash)
+        else:
+            node = self._walk('put', bucket, key, key_hash)
         # if key/value already exists, value is updated. Size does not change.
         if node:
             node.value = value
         else:
-            self._buckets[index].insert(key, value)
+            bucket.insert(key, value, key_hash)
             self._size += 1
+            self._mutations += 1
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """ Adds amount to the count stored for a key (0 if absent) and returns
+        the new count. Unlike contains_key, get and put, the key is hashed once
+        and its bucket walked once.
+        """
+        if self.table_load() >= 1:
+            self._grow()
+
+        key_hash = self._hash_function(key)
+        if self._old_buckets is not None:
+            bucket = self._migrating_bucket(key_hash)
+        elif self._mask:
+            bucket = self._buckets[key_hash & self._mask]
+        else:
+            bucket = self._buckets[key_hash % self._capacity]
+        if self._stats is None:
+            node = bucket.contains(key, key_hash)
+        else:
+            node = self._walk('increment', bucket, key, key_hash)
+        if node:
+            node.value += amount
+            return node.value
+        bucket.insert(key, amount, key_hash)
+        self._size += 1
+        self._mutations += 1
+        return amount
+
+    def put_many(self, items) -> None:
+        """ Puts every (key, value) pair of an iterable. The table is resized
+        at most once, for the final number of keys, and all keys are hashed up front.
+        """
+        items = list(items)
+        keys = [key for key, _ in items]
+        self._finish_migration()
+        needed = self._size + len(set(keys))
+        if needed > self._capacity:
+            self.resize_table(needed)
+
+        hashes = batch_hash_function(self._hash_function)(keys)
+        get_bucket, capacity = self._buckets.get_at_index, self._capacity
+        for (key, value), key_hash in zip(items, hashes):
+            self._insert(get_bucket(key_hash % capacity), key, value, key_hash)
+
+    def get_many(self, keys) -> DynamicArray:
+        """ Returns a dynamic array with the value of every given key, in
+        order. Missing keys give None.
+        """
+        keys = list(keys)
+        self._finish_migration()
+        hashes = batch_hash_function(self._hash_function)(keys)
+        get_bucket, capacity = self._buckets.get_at_index, self._capacity
+        values = []
+        for key, key_hash in zip(keys, hashes):
+            bucket = get_bucket(key_hash % capacity)
+            if self._stats is None:
+                node = bucket.contains(key, key_hash)
+            else:
+                node = self._walk('get', bucket, key, key_hash)
+            values.append(node.value if node else None)
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """ Removes every given key/value pair from the hash map.
+        """
+        keys = list(keys)
+        self._finish_migration()
+        hashes = batch_hash_function(self._hash_function)(keys)
+        get_bucket, capacity = self._buckets.get_at_index, self._capacity
+        for key, key_hash in zip(keys, hashes):
+            bucket = get_bucket(key_hash % capacity)
+            if self._stats is None:
+                removed = bucket.remove(key, key_hash)
+            else:
+                removed = self._counted_remove(bucket, key, key_hash)
+            if removed:
+                self._size -= 1
+                self._mutations += 1
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def _grow(self) -> None:
+        """ Doubles the capacity, either all at once or by starting an
+        incremental resize that later operations complete.
+        """
+        if not self._incremental_resize:
+            self.resize_table(self._capacity*2)
+            return
+
+        self._finish_migration()
+        start = time.perf_counter() if self._stats is not None else 0.0
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrated = 0
+        self._mutations += 1
+        self._resizes += 1
+
+        # new LinkedLists are allocated alongside the migration, so no single
+        # operation pays for allocating the whole table either
+        self._set_capacity(self._round_capacity(self._capacity*2))
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._allocated = 0
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def _shrink(self) -> None:
+        """ Shrinks the table to a load factor of SHRINK_TARGET, or to the
+        initial capacity if that is larger.
+        """
+        capacity = self._round_capacity(
+            max(self._min_capacity, int(self._size / SHRINK_TARGET) + 1))
+        if capacity < self._capacity:
+            self.resize_table(capacity)
+
+    def _migrating_bucket(self, key_hash: int) -> LinkedList:
+        """ Moves the next few old buckets into the new table, then returns the
+        bucket holding keys with the given hash: the old one if it has not been
+        migrated yet, otherwise the new one.
+        """
+        self._migrate(self._incremental_resize)
+        if self._old_buckets is not None:
+            old_index = key_hash % self._old_capacity
+            if old_index >= self._migrated:
+                return self._old_buckets[old_index]
+            return self._new_bucket(key_hash % self._capacity)
+        return self._buckets[key_hash % self._capacity]
+
+    def _new_bucket(self, index: int) -> LinkedList:
+        """ Returns a bucket of the new table, allocating it if needed.
+        """
+        bucket = self._buckets[index]
+        if bucket is None:
+            bucket = LinkedList()
+            self._buckets[index] = bucket
+        return bucket
+
+    def _migrate(self, count: int) -> None:
+        """ Moves up to count buckets of the old table into the new table and
+        allocates a proportional share of the new table's buckets.
+        """
+        start = time.perf_counter() if self._stats is not None else 0.0
+        end = min(self._migrated + count, self._old_capacity)
+        for i in range(self._migrated, end):
+            for node in self._old_buckets[i]:
+                self._new_bucket(node.hash % self._capacity).insert(
+                    node.key, node.value, node.hash)
+            # releases the old chain right away
+            self._old_buckets[i] = None
+        self._migrated = end
+
+        allocated = -(-end * self._capacity // self._old_capacity)
+        for i in range(self._allocated, allocated):
+            if self._buckets[i] is None:
+                self._buckets[i] = LinkedList()
+        self._allocated = allocated
+
+        if end == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrated = 0
+
+        if self._stats is not None:
+            # every step of an incremental resize adds its time
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def _finish_migration(self) -> None:
+        """ Completes an incremental resize that is still in progress.
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._old_capacity)
 
     def empty_buckets(self) -> int:
         """Returns the number of empty buckets in the hash table.
         """
+        self._finish_migration()
         empty = 0
         for i in range(self._capacity):
             if self._buckets[i].length() == 0:
@@ -124,36 +400,90 @@ class HashMap:
 
         return empty
 
+    def stats(self) -> dict:
+        """Returns a plain dict describing the table: size, capacity, load, the
+        number of resizes and a histogram of chain lengths as (length, count)
+        pairs. An incremental resize counts once, when it starts. For a map
+        created with instrument=True, it also holds per-operation calls, probes
+        and hit ratios, a histogram of probe lengths, and the time spent
+        resizing, all steps of incremental resizes included.
+        """
+        chain_lengths = {}
+        tables = [(self._buckets, self._capacity)]
+        if self._old_buckets is not None:
+            tables.append((self._old_buckets, self._old_capacity))
+        for buckets, capacity in tables:
+            for i in range(capacity):
+                if buckets[i] is not None:
+                    length = buckets[i].length()
+                    chain_lengths[length] = chain_lengths.get(length, 0) + 1
+
+        report = {'enabled': self._stats is not None,
+                  'size': self._size,
+                  'capacity': self._capacity,
+                  'load': self.table_load(),
+                  'resizes': self._resizes,
+                  'chain_lengths': sorted(chain_lengths.items())}
+        if self._stats is not None:
+            report.update(self._stats.to_dict())
+        return report
+
     def table_load(self) -> float:
         """Returns the current hash table load factor.
         """
         return self._size/self._capacity
 
-    def clear(self) -> None:
-        """Clears the contents. Capacity is not affected.
+    def clear(self, shrink_to: int = None) -> None:
+        """Clears the contents. Capacity is not affected, unless shrink_to
+        gives a new one.
         """
-        for i in range(self._capacity):
-            if self._buckets[i].length() != 0:
-                # size is updated to reflect SLL's deleted nodes
-                self._size -= self._buckets[i].length()
-                self._buckets[i] = LinkedList()
+        if self._old_buckets is not None or shrink_to is not None:
+            # buckets still waiting to be migrated are simply dropped
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrated = 0
+            if shrink_to is not None:
+                self._set_capacity(self._round_capacity(max(shrink_to, 1)))
+            self._buckets = DynamicArray([LinkedList() for _ in range(self._capacity)])
+        else:
+            for i in range(self._capacity):
+                if self._buckets[i].length() != 0:
+                    self._buckets[i].clear()
+        self._size = 0
+        self._mutations += 1
+
+    def compact(self) -> None:
+        """Shrinks the table to the smallest capacity that keeps the load
+        factor at SHRINK_TARGET. Capacity is never increased.
+        """
+        capacity = self._round_capacity(int(self.get_size() / SHRINK_TARGET) + 1)
+        if capacity < self._capacity:
+            self.resize_table(capacity)
 
     def resize_table(self, new_capacity: int) -> None:
-        """Changes the capacity of the internal hash table.
+        """Changes the capacity of the internal hash table. Nodes are moved
+        using their stored hashes, so no key is hashed again.
         """
         if new_capacity < 1:
             return
 
+        self._finish_migration()
+        start = time.perf_counter() if self._stats is not None else 0.0
+        self._mutations += 1
+        self._resizes += 1
         prev_buckets = self._buckets
 
-        # determines a prime number capacity. Note: 2 is a prime number
-        if new_capacity != 2:
-            new_capacity = self._next_prime(new_capacity)
+        # determines a prime number (or power of two) capacity
+        new_capacity = self._round_capacity(new_capacity)
+
+        # re-inserting through put() would double the table whenever the load
+        # reached 1, so the final capacity is worked out up front instead
+        while new_capacity < self._size:
+            new_capacity = self._round_capacity(new_capacity * 2)
 
         # creates new table
         self._buckets = DynamicArray()
-        self._capacity = new_capacity
-        self._size = 0
+        self._set_capacity(new_capacity)
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
@@ -161,13 +491,26 @@ class HashMap:
         for i in range(prev_buckets.length()):
             if prev_buckets[i].length() != 0:
                 for node in prev_buckets[i]:
-                    self.put(node.key, node.value)
+                    self._buckets[node.hash % new_capacity].insert(
+                        node.key, node.value, node.hash)
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
 
     def get(self, key: str) -> object:
         """Returns the value associated with the given key.
         """
-        index = self.calc_index(key)
-        node = self._buckets[index].contains(key)
+        key_hash = self._hash_function(key)
+        if self._old_buckets is not None:
+            bucket = self._migrating_bucket(key_hash)
+        elif self._mask:
+            bucket = self._buckets[key_hash & self._mask]
+        else:
+            bucket = self._buckets[key_hash % self._capacity]
+        if self._stats is None:
+            node = bucket.contains(key, key_hash)
+        else:
+            node = self._walk('get', bucket, key, key_hash)
         if node:
             return node.value
         else:
@@ -176,6 +519,14 @@ class HashMap:
     def contains_key(self, key: str) -> bool:
         """Return true if key exists. Otherwise, False.
         """
+        if self._stats is not None:
+            key_hash = self._hash_function(key)
+            if self._old_buckets is not None:
+                bucket = self._migrating_bucket(key_hash)
+            else:
+                bucket = self._buckets[key_hash % self._capacity]
+            node = self._walk('contains', bucket, key, key_hash)
+            return node is not None and node.value is not None
         if self.get(key) is not None:
             return True
         else:
@@ -184,15 +535,90 @@ class HashMap:
     def remove(self, key: str) -> None:
         """Removes key/value pair from the hash map
         """
-        index = self.calc_index(key)
-        removed = self._buckets[index].remove(key)
+        key_hash = self._hash_function(key)
+        if self._old_buckets is not None:
+            bucket = self._migrating_bucket(key_hash)
+        elif self._mask:
+            bucket = self._buckets[key_hash & self._mask]
+        else:
+            bucket = self._buckets[key_hash % self._capacity]
+        if self._stats is None:
+            removed = bucket.remove(key, key_hash)
+        else:
+            removed = self._counted_remove(bucket, key, key_hash)
         if removed:
             self._size -= 1
+            self._mutations += 1
+            if self._size < self._shrink_load * self._capacity:
+                self._shrink()
+
+    def _counted_remove(self, bucket: LinkedList, key: str, key_hash: int) -> bool:
+        """ Removes a key from its bucket like bucket.remove, recording the
+        nodes compared. Used by instrumented maps only.
+        """
+        # the list walks the chain again to unlink the node, but stops at it too
+        return self._walk('remove', bucket, key, key_hash) is not None and \
+            bucket.remove(key, key_hash)
+
+    def memory_usage(self) -> dict:
+        """Returns the bytes used by the bucket array (including its
+        LinkedLists), the chain nodes and their cached hashes, the keys and
+        the values, along with their total. Objects shared between entries,
+        such as small ints, are counted once per entry.
+        """
+        usage = {'buckets': 0, 'entries': 0, 'keys': 0, 'values': 0}
+        tables = [(self._buckets, self._capacity)]
+        if self._old_buckets is not None:
+            tables.append((self._old_buckets, self._old_capacity))
+
+        for buckets, capacity in tables:
+            usage['buckets'] += sys.getsizeof(buckets)
+            for i in range(capacity):
+                bucket = buckets[i]
+                if bucket is None:
+                    continue
+                usage['buckets'] += sys.getsizeof(bucket)
+                for node in bucket:
+                    usage['entries'] += sys.getsizeof(node) + sys.getsizeof(node.hash)
+                    usage['keys'] += sys.getsizeof(node.key)
+                    usage['values'] += sys.getsizeof(node.value)
+
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def save(self, path: str) -> None:
+        """Writes a binary snapshot of the map to path (see hash_map_snapshot).
+        """
+        # imported here, as hash_map_snapshot imports this module
+        import hash_map_snapshot
+        hash_map_snapshot.save(self, path)
+
+    @classmethod
+    def load(cls, path: str, function: callable = hash_function_1, **options):
+        """Returns a MappedHashMap serving lookups from a snapshot file, which
+        turns into a HashMap of this class, created with options, once it is
+        changed.
+        """
+        import hash_map_snapshot
+        return hash_map_snapshot.load(path, function, cls, **options)
+
+    def _load_entries(self, entries: list) -> None:
+        """ Inserts (key, value, hash) tuples of distinct keys with their
+        stored hashes, growing the table at most once up front.
+        """
+        self._finish_migration()
+        if self._size + len(entries) > self._capacity:
+            self.resize_table(self._size + len(entries))
+
+        get_bucket, capacity = self._buckets.get_at_index, self._capacity
+        for key, value, key_hash in entries:
+            self._insert(get_bucket(key_hash % capacity), key, value, key_hash)
 
     def get_keys_and_values(self) -> DynamicArray:
         """Returns a dynamic array where each index contains a tuple of a
         key/value pair stored in the hash map. Order of keys does not matter.
         """
+        self._finish_migration()
         da = DynamicArray()
         for i in range(self._capacity):
             if self._buckets[i].length() != 0:
@@ -200,6 +626,35 @@ class HashMap:
                     da.append((node.key, node.value))
         return da
 
+    def __iter__(self):
+        """ Returns a new iterator over the SLNode of every key, which walks
+        the buckets lazily. It raises ConcurrentModificationException if a
+        key is added or removed, or the table rebuilt, during the loop.
+        """
+        self._finish_migration()
+        mutations = self._mutations
+        buckets = self._buckets
+        for i in range(self._capacity):
+            for node in buckets[i]:
+                yield node
+                if self._mutations != mutations:
+                    raise ConcurrentModificationException
+
+    def keys(self) -> MapView:
+        """Returns a lazy view of the keys.
+        """
+        return MapView(self, 'keys')
+
+    def values(self) -> MapView:
+        """Returns a lazy view of the values.
+        """
+        return MapView(self, 'values')
+
+    def items(self) -> MapView:
+        """Returns a lazy view of the (key, value) pairs.
+        """
+        return MapView(self, 'items')
+
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """Receives a dynamic array in either sorted or unsorted order.
@@ -232,6 +687,160 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     return da_mode, curr_mode
 
 
+def _count_chunk(keys: list, function: callable) -> DynamicArray:
+    """Counts the keys of one chunk in a local HashMap and returns its
+    (key, count) pairs. Runs in a worker process.
+    """
+    counts = HashMap(len(keys) // 4 + 1, function)
+    for key in keys:
+        counts.increment(key)
+    return counts.get_keys_and_values()
+
+
+def _find_occurrences(keys: list, wanted: list, function: callable) -> list:
+    """Receives a chunk and (key, n) pairs. Returns (key, index) pairs with
+    the index in the chunk of the nth occurrence of each key. Runs in a
+    worker process.
+    """
+    remaining = HashMap(len(wanted), function)
+    for key, n in wanted:
+        remaining.put(key, n)
+
+    found = []
+    for index in range(len(keys)):
+        if remaining.get(keys[index]) is not None:
+            if remaining.increment(keys[index], -1) == 0:
+                found.append((keys[index], index))
+                remaining.remove(keys[index])
+    return found
+
+
+def find_mode_parallel(da: DynamicArray, workers: int = None,
+                       chunk_size: int = None,
+                       function: callable = hash_function_1) -> (DynamicArray, int):
+    """Returns the same tuple as find_mode, counting chunks of chunk_size
+    elements in a pool of worker processes (os.cpu_count() by default) and
+    merging their counts. By default every worker gets four chunks. The hash
+    function is sent to the workers, so it must be a module-level function.
+    """
+    length = da.length()
+    if length == 0:
+        return DynamicArray(), 1
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = -(-length // (workers * 4))
+    starts = range(0, length, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = [da.slice(start, start + chunk_size) for start in starts]
+        partials = list(pool.map(_count_chunk, chunks,
+                                 [function] * len(chunks)))
+
+        # merges the partial counts
+        totals = HashMap(length // 4 + 1, function)
+        frequency = 1
+        for pairs in partials:
+            for i in range(pairs.length()):
+                key, count = pairs[i]
+                frequency = max(frequency, totals.increment(key, count))
+        if frequency == 1:
+            # every key is a mode, in the order of the input
+            return DynamicArray(da.slice(0, length)), 1
+
+        # find_mode lists the modes in the order they reach the frequency,
+        # so the chunk holding each mode's last occurrence is worked out
+        seen = HashMap(11, function)
+        wanted = [[] for _ in chunks]
+        for chunk, pairs in enumerate(partials):
+            for i in range(pairs.length()):
+                key, count = pairs[i]
+                if totals.get(key) == frequency:
+                    before = seen.increment(key, count) - count
+                    if before + count == frequency:
+                        wanted[chunk].append((key, frequency - before))
+
+        searched = [chunk for chunk in range(len(chunks)) if wanted[chunk]]
+        found = pool.map(_find_occurrences,
+                         [chunks[chunk] for chunk in searched],
+                         [wanted[chunk] for chunk in searched],
+                         [function] * len(searched))
+        positions = []
+        for chunk, pairs in zip(searched, found):
+            positions += [(starts[chunk] + index, key) for key, index in pairs]
+
+    positions.sort()
+    return DynamicArray([key for _, key in positions]), frequency
+
+
+class ModeCounter:
+    """
+    Counts a stream of keys fed in any number of chunks and keeps the current
+    mode(s) and their frequency, so they can be read at any point without
+    scanning again. The answer is always the one find_mode would give for
+    all the keys seen so far.
+    """
+
+    def __init__(self, capacity: int = 11,
+                 function: callable = hash_function_1) -> None:
+        """
+        Initialize an empty counter whose counts are kept in a HashMap.
+        """
+        self._counts = HashMap(capacity, function)
+        self._modes = DynamicArray()
+        # set to the lowest possible mode, like find_mode
+        self._frequency = 1
+
+    def add(self, key: str) -> int:
+        """Counts one key and returns its count so far.
+        """
+        count = self._counts.increment(key)
+        if count > self._frequency:
+            # a new mode (other than 1)
+            self._modes = DynamicArray()
+            self._frequency = count
+        if count == self._frequency:
+            self._modes.append(key)
+        return count
+
+    def update(self, keys) -> None:
+        """Counts every key of an iterable, such as a generator, a list or a
+        DynamicArray. Each key is hashed once.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = keys.slice(0, keys.length())
+
+        increment = self._counts.increment
+        for key in keys:
+            count = increment(key)
+            if count > self._frequency:
+                self._modes = DynamicArray()
+                self._frequency = count
+            if count == self._frequency:
+                self._modes.append(key)
+
+    def get_count(self, key: str) -> int:
+        """Returns how many times a key has been seen.
+        """
+        count = self._counts.get(key)
+        return count if count is not None else 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array of (key, count) tuples, one per key seen.
+        """
+        return self._counts.get_keys_and_values()
+
+    def memory_usage(self) -> dict:
+        """Returns the memory usage of the HashMap holding the counts.
+        """
+        return self._counts.memory_usage()
+
+    def get_mode(self) -> (DynamicArray, int):
+        """Returns a tuple of an array of the current mode(s) and their
+        frequency. The array is a copy, so later updates do not change it.
+        """
+        return DynamicArray(self._modes.slice(0, self._modes.length())), self._frequency
+
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -433,3 +1042,49 @@ if __name__ == "__main__":
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
 
+
+    print("\nfind_mode_parallel example")
+    print("-----------------------------")
+    for case in test_cases:
+        da = DynamicArray(case * 50)
+        print(find_mode(da)[1] == find_mode_parallel(da, 2, 40)[1],
+              str(find_mode(da)[0]) == str(find_mode_parallel(da, 2, 40)[0]))
+
+    print("\nModeCounter example")
+    print("-----------------------------")
+    counter = ModeCounter()
+    counter.update(word for word in ["Arch", "Manjaro", "Manjaro", "Mint"])
+    mode, frequency = counter.get_mode()
+    print(f"Mode : {mode}, Frequency: {frequency}")
+    counter.update(DynamicArray(["Mint", "Mint", "Ubuntu"]))
+    mode, frequency = counter.get_mode()
+    print(f"Mode : {mode}, Frequency: {frequency}")
+    print(counter.add("Ubuntu"), counter.add("Ubuntu"), counter.get_count("Arch"))
+    mode, frequency = counter.get_mode()
+    print(f"Mode : {mode}, Frequency: {frequency}")
+
+    print("\nShrink example")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_1, shrink_load=0.25)
+    for i in range(500):
+        m.put('str' + str(i), i)
+    print(m.get_size(), m.get_capacity())
+    for i in range(480):
+        m.remove('str' + str(i))
+        if i % 160 == 159:
+            print(m.get_size(), m.get_capacity())
+    m.clear(shrink_to=5)
+    print(m.get_size(), m.get_capacity())
+
+    print("\nViews example")
+    print("-----------------------------")
+    m = HashMap(11, hash_function_1)
+    for i in range(6):
+        m.put('str' + str(i), i)
+    print(sorted(m.keys()), sum(m.values()), len(m.items()))
+    print([chunk.length() for chunk in m.items().chunks(4)])
+    try:
+        for key in m.keys():
+            m.put(key + '!', 0)
+    except ConcurrentModificationException:
+        print("ConcurrentModificationException")
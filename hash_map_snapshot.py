@@ -0,0 +1,403 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Binary snapshots of the HashMaps. save writes the table to a
+# file with one bucket per slot of the map, where each record holds the key's
+# stored hash and where its key and value are in the file. load maps the file
+# into memory with mmap and returns a MappedHashMap, which answers get and
+# contains_key straight from the mapped bytes: a lookup hashes the key, reads
+# the bucket's record range from the directory and compares the stored hashes
+# before the keys. Loading reads only the header, so it takes the same time
+# for any size of map. The first method that changes the map, or needs it as a
+# whole, copies every pair into a real HashMap, and the file is no longer used.
+#
+# File layout (version 1, little-endian):
+#   header     magic, version, kind (0 SC, 1 OA), flags (1 power of two),
+#              capacity, size and the saved hash function's hash of CHECK_KEY
+#   directory  capacity + 1 record indexes. The records of bucket i are the
+#              ones from directory[i] to directory[i + 1].
+#   records    per key: hash, key offset, key length, value length and value
+#              offset. Hashes are unsigned 64-bit, and a key's bucket is its
+#              stored hash modulo the capacity.
+#   data       keys in UTF-8 (lone surrogates passed through) and values
+#              pickled
+
+import mmap
+import os
+import pickle
+import struct
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import (ConcurrentModificationException, DynamicArray,
+                        HashEntry, MapView, hash_function_1, hash_function_2)
+
+MAGIC = b'A6HMSNAP'
+VERSION = 1
+
+KIND_SC = 0
+KIND_OA = 1
+FLAG_POWER_OF_TWO = 1
+
+# key hashed into the header, so a snapshot is never read with a hash
+# function other than the one it was saved with
+CHECK_KEY = 'A6-HashMap snapshot'
+
+_HEADER = struct.Struct('<8sHBBxxxxQQQ')
+_INDEX = struct.Struct('<Q')
+_RANGE = struct.Struct('<QQ')
+_RECORD = struct.Struct('<QQIIQ')
+_MASK_64 = 0xffffffffffffffff
+
+# a str may hold lone surrogates, which plain UTF-8 cannot encode
+_ERRORS = 'surrogatepass'
+
+
+class SnapshotException(Exception):
+    pass
+
+
+def save(hash_map, path: str) -> None:
+    """
+    Writes a snapshot of a HashMap of hash_map_sc, hash_map_oa or one of its
+    subclasses to path. The file is written next to path and renamed over it,
+    so a crash never leaves a partial snapshot, and the rename is on disk
+    before save returns.
+    """
+    if isinstance(hash_map, hash_map_sc.HashMap):
+        kind = KIND_SC
+        hash_map._finish_migration()
+        entries = [node for i in range(hash_map._capacity)
+                   for node in hash_map._buckets[i]]
+    else:
+        kind = KIND_OA
+        entries = list(hash_map)
+
+    capacity = hash_map.get_capacity()
+    flags = FLAG_POWER_OF_TWO if getattr(hash_map, '_power_of_two', False) else 0
+    check = hash_map._hash_function(CHECK_KEY) & _MASK_64
+
+    # counting sort of the entries by bucket
+    # by the masked hash the record stores, which is the one _find looks up
+    buckets = [(entry.hash & _MASK_64) % capacity for entry in entries]
+    directory = [0] * (capacity + 1)
+    for bucket in buckets:
+        directory[bucket + 1] += 1
+    for i in range(capacity):
+        directory[i + 1] += directory[i]
+    order = [None] * len(entries)
+    slots = directory[:-1]
+    for entry, bucket in zip(entries, buckets):
+        order[slots[bucket]] = entry
+        slots[bucket] += 1
+
+    records_offset = _HEADER.size + _INDEX.size * (capacity + 1)
+    offset = records_offset + _RECORD.size * len(entries)
+    records, data = [], []
+    for entry in order:
+        key = entry.key.encode('utf-8', _ERRORS)
+        value = pickle.dumps(entry.value, pickle.HIGHEST_PROTOCOL)
+        records.append(_RECORD.pack(entry.hash & _MASK_64, offset, len(key),
+                                    len(value), offset + len(key)))
+        data.append(key)
+        data.append(value)
+        offset += len(key) + len(value)
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, kind, flags, capacity,
+                                len(entries), check))
+        file.write(struct.pack('<%dQ' % (capacity + 1), *directory))
+        file.write(b''.join(records))
+        file.write(b''.join(data))
+        # on disk before the rename, so the old snapshot is only replaced
+        # by a complete one
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def _fsync_directory(directory: str) -> None:
+    """
+    Forces the entries of a directory, such as a rename into it, to disk.
+    Windows cannot open a directory, and commits renames on its own.
+    """
+    if os.name == 'nt':
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def load(path: str, function: callable = hash_function_1, cls=None, **options):
+    """
+    Maps a snapshot into memory and returns a MappedHashMap over it. function
+    must be the hash function the map was created with. The first change
+    turns it into a HashMap of cls, by default the map type that was saved,
+    created with the given keyword options (such as probing or max_load).
+    """
+    return MappedHashMap(path, function, cls, **options)
+
+
+class MappedHashMap:
+    def __init__(self, path: str, function: callable = hash_function_1,
+                 cls=None, **options) -> None:
+        """
+        Initialize a read-only view of a snapshot file. options are passed to
+        cls when the snapshot is copied into a HashMap. Raises
+        SnapshotException if the file is not a snapshot of a supported
+        version, is too short for the directory and records its header
+        describes, or was saved with another hash function.
+        """
+        # the HashMap the snapshot was copied into, once it changed
+        self._map = None
+
+        with open(path, 'rb') as file:
+            # an empty file cannot be mapped, and is no snapshot anyway
+            if os.fstat(file.fileno()).st_size < _HEADER.size:
+                raise SnapshotException
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, kind, flags, capacity, size, check = \
+            _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != VERSION:
+            self._buffer.close()
+            raise SnapshotException
+
+        # a truncated file would otherwise fail in the middle of a lookup.
+        # Only the header and the last directory index are read, so loading
+        # still takes the same time for any size of map.
+        records = _HEADER.size + _INDEX.size * (capacity + 1)
+        if capacity < 1 or len(self._buffer) < records + _RECORD.size * size or \
+                _INDEX.unpack_from(self._buffer, records - _INDEX.size)[0] != size:
+            self._buffer.close()
+            raise SnapshotException
+
+        if cls is None:
+            cls = hash_map_sc.HashMap if kind == KIND_SC else hash_map_oa.HashMap
+        self._cls = cls
+        self._function = function
+        self._options = options
+        if flags & FLAG_POWER_OF_TWO:
+            self._options.setdefault('power_of_two', True)
+        self._capacity = capacity
+        self._size = size
+        self._directory = _HEADER.size
+        self._records = _HEADER.size + _INDEX.size * (capacity + 1)
+
+        # a map of the smallest capacity gives the hash function wrapped the
+        # same way (mixed or not) as the saved map's, without a full table
+        self._hash_function = self._new_map(1)._hash_function
+        if self._hash_function(CHECK_KEY) & _MASK_64 != check:
+            self._buffer.close()
+            raise SnapshotException
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as the HashMap
+        """
+        return str(self._materialize())
+
+    def __getattr__(self, name: str):
+        """ Methods not defined here, such as put_many or resize_table, are
+        called on the HashMap the snapshot is copied into.
+        """
+        return getattr(self._materialize(), name)
+
+    def _new_map(self, capacity: int):
+        return self._cls(capacity, self._function, **self._options)
+
+    def _materialize(self):
+        """ Copies every pair into a HashMap of the snapshot's class, using the
+        stored hashes, and releases the file. Returns the HashMap.
+        """
+        if self._map is not None:
+            return self._map
+        hash_map = self._new_map(self._capacity)
+        hash_map._load_entries(self._entries())
+        self._map = hash_map
+        self._buffer.close()
+        return hash_map
+
+    def _entries(self) -> list:
+        """ Returns a (key, value, hash) tuple for every record of the file.
+        """
+        return [self._read(offset) for offset in
+                range(self._records, self._records + _RECORD.size * self._size,
+                      _RECORD.size)]
+
+    def _read(self, offset: int) -> tuple:
+        """ Returns the (key, value, hash) tuple of the record at an offset.
+        """
+        buffer = self._buffer
+        key_hash, key_offset, key_length, value_length, value_offset = \
+            _RECORD.unpack_from(buffer, offset)
+        return (buffer[key_offset:key_offset + key_length].decode('utf-8', _ERRORS),
+                pickle.loads(buffer[value_offset:value_offset + value_length]),
+                key_hash)
+
+    def _find(self, key: str) -> int:
+        """ Returns the file offset of the record of a key, or -1 if absent.
+        """
+        buffer = self._buffer
+        key_hash = self._hash_function(key) & _MASK_64
+        start, end = _RANGE.unpack_from(
+            buffer, self._directory + _INDEX.size * (key_hash % self._capacity))
+        if not start <= end <= self._size:
+            raise SnapshotException
+
+        encoded = None
+        for offset in range(self._records + _RECORD.size * start,
+                            self._records + _RECORD.size * end, _RECORD.size):
+            record_hash, key_offset, key_length, _, _ = _RECORD.unpack_from(buffer, offset)
+            if record_hash != key_hash:
+                continue
+            if encoded is None:
+                encoded = key.encode('utf-8', _ERRORS)
+            if key_length == len(encoded) and \
+                    buffer[key_offset:key_offset + key_length] == encoded:
+                return offset
+        return -1
+
+    # ------------------------------------------------------------------ #
+    def close(self) -> None:
+        """Releases the file of a map that is still mapped, which must not be
+        used afterwards. A map already copied into a HashMap is not changed.
+        """
+        if self._map is None:
+            self._buffer.close()
+
+    def is_mapped(self) -> bool:
+        """Return true while lookups are still served from the file.
+        """
+        return self._map is None
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size if self._map is None else self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity if self._map is None else self._map.get_capacity()
+
+    def table_load(self) -> float:
+        """Returns the current hash table load factor.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key. Only the key's
+        value is unpickled.
+        """
+        if self._map is not None:
+            return self._map.get(key)
+        offset = self._find(key)
+        if offset == -1:
+            return None
+        _, _, _, value_length, value_offset = _RECORD.unpack_from(self._buffer, offset)
+        return pickle.loads(self._buffer[value_offset:value_offset + value_length])
+
+    def contains_key(self, key: str) -> bool:
+        """Return true if key exists. Otherwise, False.
+        """
+        if self.get(key) is not None:
+            return True
+        else:
+            return False
+
+    def put(self, key: str, value: object) -> None:
+        """ Updates the key/value pair, after copying the snapshot into a
+        HashMap.
+        """
+        self._materialize().put(key, value)
+
+    def remove(self, key: str) -> None:
+        """Removes key/value pair, after copying the snapshot into a HashMap.
+        """
+        self._materialize().remove(key)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array where each index contains a tuple of a
+        key/value pair stored in the hash map. Order of keys does not matter.
+        """
+        if self._map is not None:
+            return self._map.get_keys_and_values()
+        return DynamicArray([(key, value) for key, value, _ in self._entries()])
+
+    def __iter__(self):
+        """ Returns a new iterator over the entries of the map. While the map
+        is mapped, it reads one record at a time and yields it as a HashEntry.
+        It raises ConcurrentModificationException if the map is copied into a
+        HashMap during the loop.
+        """
+        if self._map is not None:
+            yield from self._map
+            return
+        for offset in range(self._records, self._records + _RECORD.size * self._size,
+                            _RECORD.size):
+            if self._map is not None:
+                raise ConcurrentModificationException
+            yield HashEntry(*self._read(offset))
+
+    def keys(self) -> MapView:
+        """Returns a lazy view of the keys, read from the file while mapped.
+        """
+        return MapView(self, 'keys')
+
+    def values(self) -> MapView:
+        """Returns a lazy view of the values, read from the file while mapped.
+        """
+        return MapView(self, 'values')
+
+    def items(self) -> MapView:
+        """Returns a lazy view of the (key, value) pairs, read from the file
+        while mapped.
+        """
+        return MapView(self, 'items')
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+
+    print("\nSC snapshot example")
+    print("-------------------")
+    m = hash_map_sc.HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    path = os.path.join(directory, 'sc.snapshot')
+    m.save(path)
+    loaded = hash_map_sc.HashMap.load(path, hash_function_1)
+    print(loaded.get_size(), loaded.get_capacity(), loaded.get('str42'),
+          loaded.contains_key('str200'), loaded.is_mapped())
+    loaded.put('str200', 1)
+    print(loaded.get_size(), loaded.get('str42'), loaded.contains_key('str200'),
+          loaded.is_mapped())
+
+    print("\nOA snapshot example")
+    print("-------------------")
+    m = hash_map_oa.HashMap(41, hash_function_2, power_of_two=True)
+    for i in range(50):
+        m.put('str' + str(i // 3), [i, str(i)])
+    path = os.path.join(directory, 'oa.snapshot')
+    m.save(path)
+    loaded = hash_map_oa.HashMap.load(path, hash_function_2)
+    print(loaded.get_size(), loaded.get_capacity(), loaded.get('str5'), loaded.is_mapped())
+    loaded.remove('str5')
+    print(loaded.get_size(), loaded.get('str5'), loaded.empty_buckets(), loaded.is_mapped())
+
+    print("\nWrong hash function example")
+    print("---------------------------")
+    try:
+        load(path, hash_function_1)
+    except SnapshotException:
+        print("SnapshotException")
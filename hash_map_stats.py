@@ -0,0 +1,56 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Counters kept by a HashMap created with instrument=True. The maps
+# record into them where the work happens: the chain walk of the SC map and the
+# probe loop of the OA map count the nodes or slots they visit, and resizing
+# times itself, whether it runs all at once or incrementally. A map created
+# without instrument never touches them. Resizes are counted by every map,
+# instrumented or not, and reported by stats().
+
+# operations counted by both maps; the SC map adds increment
+OPERATIONS = ('get', 'contains', 'put', 'remove')
+
+
+class MapStats:
+    """
+    Calls, probes, hits and misses per operation, a histogram of probe
+    lengths, and the time spent resizing
+    """
+
+    __slots__ = ('calls', 'probes', 'hits', 'probe_lengths', 'resize_seconds')
+
+    def __init__(self, operations: tuple = OPERATIONS) -> None:
+        self.calls = dict.fromkeys(operations, 0)
+        self.probes = dict.fromkeys(operations, 0)
+        self.hits = dict.fromkeys(operations, 0)
+        self.probe_lengths = {}
+        self.resize_seconds = 0.0
+
+    def record(self, operation: str, probes: int, found: bool) -> None:
+        """Count one operation that probed the given number of slots or nodes."""
+        self.calls[operation] += 1
+        self.probes[operation] += probes
+        if found:
+            self.hits[operation] += 1
+        self.probe_lengths[probes] = self.probe_lengths.get(probes, 0) + 1
+
+    def record_resize(self, seconds: float) -> None:
+        """Add time spent resizing, or in one step of an incremental resize."""
+        self.resize_seconds += seconds
+
+    def to_dict(self) -> dict:
+        """Return the counters as plain dicts, numbers and lists."""
+        lookups = {}
+        for operation, calls in self.calls.items():
+            hits = self.hits[operation]
+            lookups[operation] = {
+                'calls': calls,
+                'probes': self.probes[operation],
+                'mean_probes': self.probes[operation] / calls if calls else 0.0,
+                'hits': hits,
+                'misses': calls - hits,
+                'hit_ratio': hits / calls if calls else 0.0,
+            }
+        return {'operations': lookups,
+                'probe_lengths': sorted(self.probe_lengths.items()),
+                'resize_seconds': self.resize_seconds}
@@ -0,0 +1,367 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Open addressing HashMap modeled on SwissTable. Slots are
+# split into groups of 16, and every slot has a control byte: EMPTY, DELETED
+# or, for a full slot, 7 bits of its key's hash. A lookup scans the control
+# bytes of a whole group with bytearray.find, which runs in C, and only
+# compares keys in the slots whose 7 bits match. Hashes are spread with one
+# Fibonacci multiplication: the group comes from the top bits of the product
+# and the control byte from its low bits. Groups are probed by triangular
+# numbers, and a lookup stops at the first group holding an EMPTY slot.
+# The public API matches hash_map_oa.HashMap, so either class can be used.
+
+import sys
+from array import array
+
+import hash_map_oa
+from a6_include import (ConcurrentModificationException, DynamicArray,
+                        HashEntry, batch_hash_function, hash_function_1,
+                        hash_function_2, next_power_of_two)
+
+GROUP_SIZE = 16
+
+# control bytes. Full slots hold 7 bits of the spread hash (0 to 127).
+EMPTY = 0x80
+DELETED = 0xfe
+
+# 2**64 divided by the golden ratio. Multiplying by it spreads the input bits
+# over the high bits of the 64-bit product.
+_FIBONACCI = 0x9e3779b97f4a7c15
+_MASK_64 = 0xffffffffffffffff
+
+
+class HashMap(hash_map_oa.HashMap):
+    def __init__(self, capacity: int, function,
+                 max_load: float = 0.875,
+                 shrink_load: float = 0.0) -> None:
+        """
+        Initialize new HashMap that probes groups of 16 control bytes.
+        The capacity is rounded up to a power of two number of groups, and
+        the table grows once the load factor reaches max_load, which must
+        be below 1. Deleted slots are reclaimed by an in-place rehash.
+        With shrink_load, remove shrinks the table once the load factor
+        falls below it; 0 never shrinks.
+        Unlike hash_map_oa, it takes no probing or instrument option.
+        """
+        # removed entries stay in the table as DELETED slots until the load
+        # with them reaches max_load, which rehashes in place
+        super().__init__(capacity, function, compact_threshold=max_load,
+                         shrink_load=shrink_load)
+        # groups are probed by triangular numbers
+        self._probing = 'triangular'
+
+        # the table doubles once the load factor reaches _max_load
+        self._max_load = max_load
+
+        # capped against this map's own _max_load (see hash_map_oa)
+        self._shrink_load = min(shrink_load, max_load / 4)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as hash_map_oa
+        """
+        out = ''
+        for i in range(self._capacity):
+            entry = None
+            if self._ctrl[i] != EMPTY:
+                entry = HashEntry(self._keys[i], self._values[i], self._hashes[i])
+                entry.is_tombstone = self._ctrl[i] == DELETED
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """ Creates an empty table of the given capacity.
+        """
+        self._ctrl = bytearray([EMPTY]) * capacity
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        # the top bits of a 64-bit product select one of the groups
+        self._group_shift = 64 - (capacity // GROUP_SIZE).bit_length() + 1
+
+    # ------------------------------------------------------------------ #
+    def _round_capacity(self, capacity: int) -> int:
+        """ Returns the capacity of a table of at least the given size: a
+        power of two number of groups.
+        """
+        groups = next_power_of_two(-(-capacity // GROUP_SIZE))
+        return groups * GROUP_SIZE
+
+    # a new table is rounded the same way as a resized one
+    _initial_capacity = _round_capacity
+
+    def calc_index(self, key: str) -> int:
+        """ Calculates the first slot of the key's home group.
+        """
+        spread = (self._hash_function(key) * _FIBONACCI) & _MASK_64
+        return (spread >> self._group_shift) * GROUP_SIZE
+
+    def _probe(self, key: str, key_hash: int) -> (int, int):
+        """ Walks the groups of a key's probe sequence, comparing keys only in
+        slots whose control byte matches. Returns the index of the key's slot
+        (-1 if absent) and the first EMPTY or DELETED slot a new entry could use.
+        """
+        ctrl, keys = self._ctrl, self._keys
+        group_mask = self._capacity // GROUP_SIZE - 1
+        spread = (key_hash * _FIBONACCI) & _MASK_64
+        tag = spread & 0x7f
+        group = spread >> self._group_shift
+        free = -1
+        step = 0
+        while True:
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            index = ctrl.find(tag, start, end)
+            while index != -1:
+                if keys[index] == key:
+                    return index, free
+                index = ctrl.find(tag, index + 1, end)
+
+            empty = ctrl.find(EMPTY, start, end)
+            if free == -1 and self._tombstones:
+                free = ctrl.find(DELETED, start, end)
+                if free != -1 and empty != -1 and empty < free:
+                    free = empty
+            if empty != -1:
+                # no key probed past a group that was never full
+                return -1, (empty if free == -1 else free)
+
+            step += 1
+            group = (group + step) & group_mask
+
+    def _find(self, key: str, key_hash: int) -> int:
+        """ Returns the index of the key's slot, or -1 if it is absent. Same
+        walk as _probe, without looking for a free slot.
+        """
+        ctrl, keys = self._ctrl, self._keys
+        spread = (key_hash * _FIBONACCI) & _MASK_64
+        tag = spread & 0x7f
+        start = (spread >> self._group_shift) * GROUP_SIZE
+        step = 0
+        while True:
+            end = start + GROUP_SIZE
+            index = ctrl.find(tag, start, end)
+            while index != -1:
+                if keys[index] == key:
+                    return index
+                index = ctrl.find(tag, index + 1, end)
+            if ctrl.find(EMPTY, start, end) != -1:
+                return -1
+
+            step += 1
+            start = (start + step * GROUP_SIZE) % self._capacity
+
+    def _insert(self, key: str, value: object, key_hash: int) -> None:
+        """ Stores the key/value pair, reusing the first DELETED slot of its
+        probe sequence. The caller makes sure the table has room.
+        """
+        index, free = self._probe(key, key_hash)
+        if index != -1:
+            # key exists and value is updated
+            self._values[index] = value
+            return
+
+        if self._ctrl[free] == DELETED:
+            self._tombstones -= 1
+        self._ctrl[free] = (key_hash * _FIBONACCI) & 0x7f
+        self._hashes[free] = key_hash & _MASK_64
+        self._keys[free] = key
+        self._values[free] = value
+        self._size += 1
+        self._mutations += 1
+
+    def get_many(self, keys) -> DynamicArray:
+        """ Returns a dynamic array with the value of every given key, in
+        order. Missing keys give None.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        values = []
+        for key, key_hash in zip(keys, hashes):
+            index = self._find(key, key_hash)
+            values.append(None if index == -1 else self._values[index])
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """ Removes every given key/value pair from the hash map.
+        """
+        keys = list(keys)
+        hashes = batch_hash_function(self._hash_function)(keys)
+        for key, key_hash in zip(keys, hashes):
+            self._remove(key, key_hash)
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def empty_buckets(self) -> int:
+        """Returns the number of empty buckets in the hash table.
+        """
+        return self._ctrl.count(EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """ Changes the capacity of the internal hash table and moves full
+        slots into the new arrays using their stored hashes.
+        """
+        if new_capacity < self._size:
+            return
+
+        self._mutations += 1
+        self._resizes += 1
+        ctrl, hashes = self._ctrl, self._hashes
+        keys, values = self._keys, self._values
+
+        # the final capacity is worked out up front so the load stays below _max_load
+        new_capacity = self._round_capacity(new_capacity)
+        while self._size and (self._size - 1) / new_capacity >= self._max_load:
+            new_capacity *= 2
+
+        self._capacity = new_capacity
+        self._tombstones = 0
+        self._allocate(new_capacity)
+
+        # moves full slots into the first EMPTY slot of their probe sequence
+        new_ctrl, new_hashes = self._ctrl, self._hashes
+        new_keys, new_values = self._keys, self._values
+        group_mask = new_capacity // GROUP_SIZE - 1
+        group_shift = self._group_shift
+        for i in range(len(ctrl)):
+            tag = ctrl[i]
+            if tag & 0x80:
+                continue
+            key_hash = hashes[i]
+            group = ((key_hash * _FIBONACCI) & _MASK_64) >> group_shift
+            step = 0
+            index = new_ctrl.find(EMPTY, group * GROUP_SIZE, (group + 1) * GROUP_SIZE)
+            while index == -1:
+                step += 1
+                group = (group + step) & group_mask
+                index = new_ctrl.find(EMPTY, group * GROUP_SIZE, (group + 1) * GROUP_SIZE)
+            new_ctrl[index] = tag
+            new_hashes[index] = key_hash
+            new_keys[index] = keys[i]
+            new_values[index] = values[i]
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key
+        """
+        index = self._find(key, self._hash_function(key))
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """ Return true if key exists in hashmap. Otherwise, False.
+        """
+        index = self._find(key, self._hash_function(key))
+        return index != -1 and self._values[index] is not None
+
+    def remove(self, key: str) -> None:
+        """Removes key/value pair from the hash map.
+        """
+        self._remove(key, self._hash_function(key))
+        if self._size < self._shrink_load * self._capacity:
+            self._shrink()
+
+    def _remove(self, key: str, key_hash: int) -> None:
+        """ Frees the slot of a key. It becomes EMPTY if its group still has an
+        EMPTY slot, since no lookup ever went past such a group. Otherwise it
+        becomes DELETED so later lookups keep probing.
+        """
+        index = self._find(key, key_hash)
+        if index == -1:
+            return
+
+        start = index - index % GROUP_SIZE
+        if self._ctrl.find(EMPTY, start, start + GROUP_SIZE) != -1:
+            self._ctrl[index] = EMPTY
+        else:
+            self._ctrl[index] = DELETED
+            self._tombstones += 1
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._mutations += 1
+
+    def clear(self, shrink_to: int = None) -> None:
+        """Clears the contents. Capacity is not affected, unless shrink_to
+        gives a new one.
+        """
+        if shrink_to is not None:
+            self._capacity = self._round_capacity(max(shrink_to, 1))
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._mutations += 1
+
+    def memory_usage(self) -> dict:
+        """Returns the bytes used by the control bytes and parallel arrays, by
+        the keys and by the values, along with their total. There are no
+        per-entry objects, so entries is always 0.
+        """
+        usage = {'buckets': sum(sys.getsizeof(part) for part in
+                                (self._ctrl, self._hashes, self._keys, self._values)),
+                 'entries': 0, 'keys': 0, 'values': 0}
+        ctrl, keys, values = self._ctrl, self._keys, self._values
+        for i in range(self._capacity):
+            if not ctrl[i] & 0x80:
+                usage['keys'] += sys.getsizeof(keys[i])
+                usage['values'] += sys.getsizeof(values[i])
+
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array where each index contains a tuple of a
+        key/value pair stored in the hash map. Order of keys does not matter.
+        """
+        ctrl, keys, values = self._ctrl, self._keys, self._values
+        return DynamicArray([(keys[i], values[i])
+                             for i in range(self._capacity) if not ctrl[i] & 0x80])
+
+    def __iter__(self):
+        """ Returns a new iterator over the full slots, as HashEntry objects
+        built on the fly, which walks the control bytes lazily. It raises
+        ConcurrentModificationException if a key is added or removed, or the
+        table rebuilt, during the loop.
+        """
+        mutations = self._mutations
+        ctrl, hashes = self._ctrl, self._hashes
+        keys, values = self._keys, self._values
+        for i in range(self._capacity):
+            if not ctrl[i] & 0x80:
+                yield HashEntry(keys[i], values[i], hashes[i])
+                if self._mutations != mutations:
+                    raise ConcurrentModificationException
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nPDF - put example 1")
+    print("-------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nPDF - remove example 1")
+    print("----------------------")
+    m = HashMap(53, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nPDF - __iter__(), __next__() example 2")
+    print("---------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
@@ -0,0 +1,243 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Separate chaining HashMap whose keys expire after a time to live
+# (TTL), given per key or by a default. A HashMap finds the entry of a key, and
+# the entries that can expire form a binary min-heap ordered by expiry time, so
+# the next key to expire is always the root. Expired keys are dropped:
+#   - lazily, when get or contains_key finds them
+#   - by expire(limit), which pops at most limit expired keys off the heap
+#   - a few at a time by every put, so a map that is only written to does not
+#     keep its expired keys
+# No expiry ever scans the whole map, and expiring k keys costs O(k log n).
+
+import time
+from operator import attrgetter
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_sc import HashMap
+from indexed_heap import sift_down, sift_up
+
+# expired keys each put reclaims
+SWEEP_PER_PUT = 2
+# ttl of a key that never expires, even when the map has a default_ttl
+FOREVER = float('inf')
+
+_EXPIRES = attrgetter('expires')
+
+
+class _Entry:
+    """
+    Entry of one key: its value, the time it expires at (None if never) and
+    its position in the heap (-1 if not in it)
+    """
+
+    __slots__ = ('key', 'value', 'expires', 'index')
+
+    def __init__(self, key: str, value: object, expires: float) -> None:
+        self.key = key
+        self.value = value
+        self.expires = expires
+        self.index = -1
+
+
+class TTLMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 default_ttl: float = None,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Initialize an empty map. Keys put without a ttl live for default_ttl
+        seconds, or forever if it is None or FOREVER. clock returns the
+        current time in seconds.
+        """
+        self._entries = HashMap(capacity, function)
+        self._default_ttl = default_ttl
+        self._clock = clock
+        # plain list, as the heap is indexed on every put of an expiring key
+        self._heap = []
+        self._expired = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide the same output as hash_map_sc
+        """
+        return str(self._entries)
+
+    def get_size(self) -> int:
+        """Returns the number of stored keys, which includes expired keys that
+        were not reclaimed yet.
+        """
+        return self._entries.get_size()
+
+    def get_capacity(self) -> int:
+        """Returns the capacity of the underlying HashMap.
+        """
+        return self._entries.get_capacity()
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """ Updates the key/value pair, which expires ttl seconds from now
+        (default_ttl if ttl is None, never if FOREVER). Then reclaims a few
+        expired keys.
+        """
+        if ttl is None:
+            ttl = self._default_ttl
+        now = self._clock()
+        expires = None if ttl is None or ttl == FOREVER else now + ttl
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(key, value, expires)
+            self._entries.put(key, entry)
+        else:
+            entry.value = value
+            if entry.index >= 0:
+                self._heap_remove(entry)
+            entry.expires = expires
+        if expires is not None:
+            self._heap_push(entry)
+
+        self._sweep(now, SWEEP_PER_PUT)
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key, or None if it is
+        absent or expired. An expired key is removed.
+        """
+        entry = self._live_entry(key)
+        return entry.value if entry else None
+
+    def contains_key(self, key: str) -> bool:
+        """Return true if key is in the hash map and not expired. Otherwise,
+        False. An expired key is removed.
+        """
+        return self._live_entry(key) is not None
+
+    def ttl(self, key: str) -> float:
+        """Returns the seconds a key has left to live, or None if it is
+        absent, expired or never expires.
+        """
+        entry = self._live_entry(key)
+        if entry is None or entry.expires is None:
+            return None
+        return entry.expires - self._clock()
+
+    def remove(self, key: str) -> None:
+        """Removes key/value pair from the hash map
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.index >= 0:
+                self._heap_remove(entry)
+            self._entries.remove(key)
+
+    def clear(self) -> None:
+        """Clears the contents. Capacity is not affected.
+        """
+        self._entries.clear()
+        self._heap = []
+
+    def expire(self, limit: int = None) -> int:
+        """Removes at most limit expired keys (all of them by default), the
+        oldest first, and returns how many were removed. Call it from a timer
+        with a small limit to reclaim keys without long pauses.
+        """
+        return self._sweep(self._clock(), limit)
+
+    def expired_count(self) -> int:
+        """Returns the number of keys removed because they expired.
+        """
+        return self._expired
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array where each index contains a tuple of a
+        key/value pair that has not expired. Order of keys does not matter.
+        """
+        now = self._clock()
+        pairs = DynamicArray()
+        entries = self._entries.get_keys_and_values()
+        for i in range(entries.length()):
+            entry = entries[i][1]
+            if entry.expires is None or entry.expires > now:
+                pairs.append((entry.key, entry.value))
+        return pairs
+
+    def _live_entry(self, key: str) -> _Entry:
+        """Returns the entry of a key, or None if it is absent or expired, in
+        which case it is removed.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.expires is None or entry.expires > self._clock():
+            return entry
+        self._heap_remove(entry)
+        self._entries.remove(key)
+        self._expired += 1
+        return None
+
+    def _sweep(self, now: float, limit: int = None) -> int:
+        """Pops expired entries off the heap, at most limit of them, and
+        removes their keys. Returns how many were removed.
+        """
+        heap = self._heap
+        removed = 0
+        while heap and heap[0].expires <= now and (limit is None or removed < limit):
+            entry = heap[0]
+            self._heap_remove(entry)
+            self._entries.remove(entry.key)
+            removed += 1
+        self._expired += removed
+        return removed
+
+    # ------------------------------------------------------------------ #
+    def _heap_push(self, entry: _Entry) -> None:
+        entry.index = len(self._heap)
+        self._heap.append(entry)
+        sift_up(self._heap, entry.index, _EXPIRES)
+
+    def _heap_remove(self, entry: _Entry) -> None:
+        """Takes an entry out of the heap, putting the last entry in its place.
+        """
+        heap = self._heap
+        index = entry.index
+        last = heap.pop()
+        entry.index = -1
+        if last is not entry:
+            heap[index] = last
+            last.index = index
+            sift_up(heap, index, _EXPIRES)
+            sift_down(heap, last.index, _EXPIRES)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    # a fake clock, so the examples do not sleep
+    now = [0.0]
+
+    def clock() -> float:
+        return now[0]
+
+    print("\nLazy expiry example")
+    print("-------------------")
+    m = TTLMap(11, hash_function_1, default_ttl=10, clock=clock)
+    m.put('session1', 'alice')
+    m.put('session2', 'bob', ttl=30)
+    m.put('config', 'on', ttl=FOREVER)
+    now[0] = 15
+    print(m.get('session1'), m.get('session2'), m.get('config'), m.ttl('session2'))
+    print(m.get_size(), m.expired_count())
+
+    print("\nSweep example")
+    print("-------------")
+    m = TTLMap(53, hash_function_2, clock=clock)
+    now[0] = 0
+    for i in range(150):
+        m.put('key' + str(i), i, ttl=i % 10 + 1)
+    now[0] = 5.5
+    print(m.expire(20), m.get_size())
+    print(m.expire(), m.get_size(), m.get_keys_and_values().length())
+    for i in range(10):
+        m.put('new' + str(i), i, ttl=100)
+    now[0] = 20
+    m.put('last', 0, ttl=100)
+    print(m.get_size(), m.expired_count())
@@ -0,0 +1,291 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: HashMap with a write-ahead log, so changes survive a restart
+# without saving the whole map after each one. Every put, remove and clear is
+# appended to the log as a binary record before the map is changed. When the
+# map is opened again it starts from the last snapshot (see hash_map_snapshot)
+# and replays the log in bulk: the log is folded into the last change of each
+# key, which is then applied with one put_many and one remove_many. Once the
+# log grows past compact_bytes, the map is saved as a new snapshot and the log
+# is emptied.
+#
+# How often the log is forced to disk is set by the sync policy:
+#   - 'always' calls fsync after every record
+#   - 'batch' calls fsync once batch_size records are pending, so they are
+#     committed as a group (and on sync and close)
+#   - 'none' hands every record to the OS but never calls fsync, so records
+#     survive the process crashing but not the machine
+#
+# Log layout: MAGIC, then per record a CRC-32, the operation, the key length
+# and the value length, followed by the key in UTF-8 and the value pickled.
+# Replay stops at the first record that is incomplete or fails its CRC, which
+# is where a crash cut the log short, and truncates the log there.
+
+import os
+import pickle
+import struct
+import zlib
+
+import hash_map_sc
+import hash_map_snapshot
+from a6_include import DynamicArray, hash_function_1
+
+MAGIC = b'A6HMWAL1'
+
+# operations
+PUT = 1
+REMOVE = 2
+CLEAR = 3
+
+SYNC_POLICIES = ('always', 'batch', 'none')
+
+LOG_FILE = 'log'
+SNAPSHOT_FILE = 'snapshot'
+
+# a record starts with the CRC-32 of the rest of it
+_RECORD = struct.Struct('<IBII')
+_CRC = struct.Struct('<I')
+_BODY = struct.Struct('<BII')
+
+
+class JournaledHashMap:
+    def __init__(self,
+                 directory: str,
+                 function: callable = hash_function_1,
+                 cls=hash_map_sc.HashMap,
+                 sync: str = 'batch',
+                 batch_size: int = 64,
+                 compact_bytes: int = 4 * 1024 * 1024) -> None:
+        """
+        Opens the map kept in a directory, created if needed, as a HashMap of
+        cls with the given hash function. sync is one of SYNC_POLICIES.
+        """
+        if sync not in SYNC_POLICIES:
+            raise ValueError(sync)
+        self._directory = directory
+        self._function = function
+        self._cls = cls
+        self._sync = sync
+        self._batch_size = batch_size
+        self._compact_bytes = compact_bytes
+        self._pending = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._log_path = os.path.join(directory, LOG_FILE)
+        self._snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+
+        # a snapshot is only mapped, so a map with an empty log opens at once
+        if os.path.exists(self._snapshot_path):
+            self._map = hash_map_snapshot.load(self._snapshot_path, function, cls)
+        else:
+            self._map = cls(11, function)
+        self._replay()
+
+        self._log = open(self._log_path, 'ab')
+        if self._log.tell() == 0:
+            self._log.write(MAGIC)
+            self._force()
+            # a new log only survives a crash once its directory entry does
+            hash_map_snapshot._fsync_directory(directory)
+
+    def _replay(self) -> None:
+        """ Applies the changes of the log to the map, after cutting off a
+        record left incomplete by a crash.
+        """
+        if not os.path.exists(self._log_path):
+            return
+        with open(self._log_path, 'rb') as file:
+            log = file.read()
+        if log[:len(MAGIC)] != MAGIC:
+            # the crash came before the log was started
+            os.remove(self._log_path)
+            return
+
+        # the last change of every key since the last clear
+        changes = {}
+        cleared = False
+        offset = len(MAGIC)
+        while offset + _RECORD.size <= len(log):
+            crc, operation, key_length, value_length = _RECORD.unpack_from(log, offset)
+            start = offset + _RECORD.size
+            end = start + key_length + value_length
+            if end > len(log) or zlib.crc32(log[offset + _CRC.size:end]) != crc:
+                break
+            if operation == CLEAR:
+                changes = {}
+                cleared = True
+            else:
+                key = log[start:start + key_length].decode(
+                    'utf-8', hash_map_snapshot._ERRORS)
+                changes[key] = (operation, log[start + key_length:end])
+            offset = end
+
+        if offset < len(log):
+            with open(self._log_path, 'r+b') as file:
+                file.truncate(offset)
+
+        if cleared:
+            self._release_snapshot()
+            self._map = self._cls(11, self._function)
+        puts = [(key, pickle.loads(value))
+                for key, (operation, value) in changes.items() if operation == PUT]
+        removes = [key for key, (operation, _) in changes.items() if operation == REMOVE]
+        if puts:
+            self._map.put_many(puts)
+        if removes:
+            self._map.remove_many(removes)
+
+    def _append(self, operation: int, key: bytes = b'', value: bytes = b'') -> None:
+        """ Appends one record to the log and forces it to disk as the sync
+        policy asks, before the map is changed.
+        """
+        body = _BODY.pack(operation, len(key), len(value)) + key + value
+        self._log.write(_CRC.pack(zlib.crc32(body)) + body)
+        self._pending += 1
+        if self._sync == 'always' or \
+                (self._sync == 'batch' and self._pending >= self._batch_size):
+            self._force()
+        elif self._sync == 'none':
+            self._log.flush()
+
+    def _force(self) -> None:
+        """ Writes the pending records and waits until they are on disk.
+        """
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._pending = 0
+
+    def _release_snapshot(self) -> None:
+        """ Unmaps the snapshot if lookups are still served from it.
+        """
+        if isinstance(self._map, hash_map_snapshot.MappedHashMap):
+            self._map.close()
+
+    def _maybe_compact(self) -> None:
+        if self._log.tell() >= self._compact_bytes:
+            self.compact()
+
+    # ------------------------------------------------------------------ #
+    def put(self, key: str, value: object) -> None:
+        """ Logs the change, then updates the key/value pair.
+        """
+        self._append(PUT, key.encode('utf-8', hash_map_snapshot._ERRORS),
+                     pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        self._map.put(key, value)
+        self._maybe_compact()
+
+    def remove(self, key: str) -> None:
+        """Logs the change, then removes key/value pair from the hash map.
+        """
+        self._append(REMOVE, key.encode('utf-8', hash_map_snapshot._ERRORS))
+        self._map.remove(key)
+        self._maybe_compact()
+
+    def clear(self) -> None:
+        """Logs the change, then clears the contents.
+        """
+        self._append(CLEAR)
+        self._map.clear()
+
+    def sync(self) -> None:
+        """Forces every logged change to disk, whatever the sync policy.
+        """
+        self._force()
+
+    def compact(self) -> None:
+        """Saves the map as the new snapshot and empties the log. A crash in
+        between leaves a log that replays to the same map. It runs inline, in
+        the put or remove that filled the log.
+        """
+        self._force()
+        self._map.save(self._snapshot_path)
+        self._log.seek(0)
+        self._log.truncate()
+        self._log.write(MAGIC)
+        self._force()
+
+    def log_size(self) -> int:
+        """Returns the size of the log in bytes, pending records included.
+        """
+        return self._log.tell()
+
+    def close(self) -> None:
+        """Forces every logged change to disk and closes the log, and the
+        snapshot if it is still mapped.
+        """
+        self._force()
+        self._log.close()
+        self._release_snapshot()
+
+    def get(self, key: str) -> object:
+        """Returns the value associated with the given key.
+        """
+        return self._map.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """Return true if key exists. Otherwise, False.
+        """
+        return self._map.contains_key(key)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._map.get_capacity()
+
+    def table_load(self) -> float:
+        """Returns the current hash table load factor.
+        """
+        return self._map.table_load()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Returns a dynamic array where each index contains a tuple of a
+        key/value pair stored in the hash map. Order of keys does not matter.
+        """
+        return self._map.get_keys_and_values()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+
+    print("\nReplay example")
+    print("--------------")
+    m = JournaledHashMap(directory, hash_function_1, sync='always')
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+    m.remove('str0')
+    m.close()
+    m = JournaledHashMap(directory, hash_function_1)
+    print(m.get_size(), m.get('str42'), m.contains_key('str0'))
+
+    print("\nCompaction example")
+    print("------------------")
+    m = JournaledHashMap(directory, hash_function_1, compact_bytes=4096)
+    for i in range(300):
+        m.put('key' + str(i), i)
+    print(m.log_size() < 4096, os.path.exists(os.path.join(directory, SNAPSHOT_FILE)))
+    m.clear()
+    m.put('after', 'clear')
+    m.close()
+    m = JournaledHashMap(directory, hash_function_1)
+    print(m.get_size(), m.get('after'), m.get('key5'))
+
+    print("\nTorn write example")
+    print("------------------")
+    m.put('kept', 1)
+    m.put('torn', 2)
+    m.close()
+    with open(os.path.join(directory, LOG_FILE), 'r+b') as log:
+        log.truncate(os.path.getsize(os.path.join(directory, LOG_FILE)) - 3)
+    m = JournaledHashMap(directory, hash_function_1)
+    print(m.get_size(), m.get('kept'), m.get('torn'))
@@ -0,0 +1,177 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Approximate heavy hitters over an unbounded stream in fixed
+# memory, using the Space-Saving algorithm. At most a fixed number of keys are
+# monitored, each with a counter. A key that is not monitored takes over the
+# counter with the smallest count, which it keeps and adds one to. The counters
+# form a binary min-heap, so that counter is always the root, and a HashMap
+# finds the counter of a monitored key. After N keys, with k counters:
+#   - every monitored key's true count is between count - error and count
+#   - every error is at most N / k
+#   - every key seen more than N / k times is monitored
+# hash_map_sc.find_mode and ModeCounter give exact answers with one node per
+# distinct key.
+
+import sys
+from operator import attrgetter
+
+from a6_include import DynamicArray, hash_function_1
+from hash_map_sc import HashMap, find_mode
+from indexed_heap import sift_down, sift_up
+
+_COUNT = attrgetter('count')
+
+
+class _Counter:
+    """
+    Counter of one monitored key: its estimated count, the most it may
+    overestimate by, and its position in the heap
+    """
+
+    __slots__ = ('key', 'count', 'error', 'index')
+
+    def __init__(self, key: str, count: int, error: int, index: int) -> None:
+        self.key = key
+        self.count = count
+        self.error = error
+        self.index = index
+
+
+class SpaceSaving:
+    def __init__(self, counters: int = 100,
+                 function: callable = hash_function_1) -> None:
+        """
+        Initialize a summary that monitors at most the given number of keys.
+        Its memory does not grow past that, however long the stream.
+        """
+        self._counters = counters
+        # the map never holds more keys than its capacity, so it never grows
+        self._monitored = HashMap(counters, function)
+        # plain list, as the heap is indexed on every key of the stream
+        self._heap = []
+        self._total = 0
+        # whether a key ever took over another key's counter
+        self._evicted = False
+
+    def add(self, key: str) -> None:
+        """Counts one key of the stream.
+        """
+        self._total += 1
+        counter = self._monitored.get(key)
+        if counter is not None:
+            counter.count += 1
+            sift_down(self._heap, counter.index, _COUNT)
+        elif len(self._heap) < self._counters:
+            counter = _Counter(key, 1, 0, len(self._heap))
+            self._heap.append(counter)
+            self._monitored.put(key, counter)
+            sift_up(self._heap, counter.index, _COUNT)
+        else:
+            # the key takes over the smallest counter, whose count becomes
+            # the most the new key's count can be overestimated by
+            counter = self._heap[0]
+            self._monitored.remove(counter.key)
+            self._evicted = True
+            counter.key = key
+            counter.error = counter.count
+            counter.count += 1
+            self._monitored.put(key, counter)
+            sift_down(self._heap, 0, _COUNT)
+
+    def update(self, keys) -> None:
+        """Counts every key of an iterable, such as a generator, a list or a
+        DynamicArray.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = keys.slice(0, keys.length())
+        for key in keys:
+            self.add(key)
+
+    def get_total(self) -> int:
+        """Returns the number of keys counted so far.
+        """
+        return self._total
+
+    def error_bound(self) -> float:
+        """Returns N / k, the most any estimated count can exceed the true one.
+        """
+        return self._total / self._counters
+
+    def get_count(self, key: str) -> (int, int):
+        """Returns the estimated count of a key and the most it can exceed the
+        true count by. A key that is not monitored gives (0, 0) if no key was
+        ever evicted, and otherwise (0, smallest count): it was seen at most
+        that many times.
+        """
+        counter = self._monitored.get(key)
+        if counter is not None:
+            return counter.count, counter.error
+        if self._evicted:
+            return 0, self._heap[0].count
+        return 0, 0
+
+    def get_top(self, k: int = None) -> DynamicArray:
+        """Returns a dynamic array of (key, count, error) tuples for the k
+        monitored keys with the largest estimated counts (all of them by
+        default), largest first.
+        """
+        counters = sorted(self._heap, key=lambda counter: counter.count, reverse=True)
+        return DynamicArray([(counter.key, counter.count, counter.error)
+                             for counter in counters[:k]])
+
+    def get_mode(self) -> (DynamicArray, int):
+        """Returns a tuple of an array of the approximate mode(s), the keys
+        with the largest estimated count, and that count. Like find_mode, an
+        empty stream gives no modes and a frequency of 1.
+        """
+        modes = DynamicArray()
+        frequency = 1
+        for counter in self._heap:
+            if counter.count > frequency:
+                modes = DynamicArray()
+                frequency = counter.count
+            if counter.count == frequency:
+                modes.append(counter.key)
+        return modes, frequency
+
+    def memory_usage(self) -> dict:
+        """Returns the bytes used by the HashMap of monitored keys (its values
+        are the counters), by the heap array and by the counters' own fields,
+        along with their total. It stops growing once every counter is in use.
+        """
+        usage = {'map': self._monitored.memory_usage()['total'],
+                 'heap': sys.getsizeof(self._heap),
+                 'counters': 0}
+        for counter in self._heap:
+            usage['counters'] += sys.getsizeof(counter.count) + \
+                sys.getsizeof(counter.error) + sys.getsizeof(counter.index)
+
+        usage['total'] = sum(usage.values())
+        return usage
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSpaceSaving example 1")
+    print("-----------------------------")
+    da = DynamicArray(["apple", "apple", "grape", "melon", "peach"])
+    summary = SpaceSaving(10)
+    summary.update(da)
+    mode, frequency = find_mode(da)
+    print(f"Exact : {mode}, Frequency: {frequency}")
+    mode, frequency = summary.get_mode()
+    print(f"Approx: {mode}, Frequency: {frequency}")
+
+    print("\nSpaceSaving example 2")
+    print("-----------------------------")
+    stream = ["2", "4", "2", "6", "8", "4", "1", "3", "4", "5", "7", "3", "3", "2", "4"] * 20
+    summary = SpaceSaving(4)
+    summary.update(key for key in stream)
+    mode, frequency = find_mode(DynamicArray(stream))
+    print(f"Exact : {mode}, Frequency: {frequency}")
+    mode, frequency = summary.get_mode()
+    print(f"Approx: {mode}, Frequency: {frequency}")
+    print(f"Top 3 : {summary.get_top(3)}")
+    print(f"Error bound: {summary.error_bound()}, count of '9': {summary.get_count('9')}")
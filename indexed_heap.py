@@ -0,0 +1,49 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Sift functions of a binary min-heap kept in a plain list, whose
+# items record their own position in an index attribute, so an item can be
+# found and moved again after its priority changes. Items are compared by a
+# key function, such as operator.attrgetter('count'). Used by the expiry heap
+# of hash_map_ttl and the counters of heavy_hitters.
+
+
+def sift_up(heap: list, index: int, key: callable) -> None:
+    """Moves an item towards the root while its key is smaller than its
+    parent's.
+    """
+    item = heap[index]
+    item_key = key(item)
+    while index > 0:
+        parent = (index - 1) // 2
+        if key(heap[parent]) <= item_key:
+            break
+        heap[index] = heap[parent]
+        heap[index].index = index
+        index = parent
+    heap[index] = item
+    item.index = index
+
+
+def sift_down(heap: list, index: int, key: callable) -> None:
+    """Moves an item away from the root while a child has a smaller key.
+    """
+    length = len(heap)
+    item = heap[index]
+    item_key = key(item)
+    while True:
+        child = 2 * index + 1
+        if child >= length:
+            break
+        child_key = key(heap[child])
+        if child + 1 < length:
+            right_key = key(heap[child + 1])
+            if right_key < child_key:
+                child += 1
+                child_key = right_key
+        if item_key <= child_key:
+            break
+        heap[index] = heap[child]
+        heap[index].index = index
+        index = child
+    heap[index] = item
+    item.index = index